@@ -0,0 +1,99 @@
+"""
+Benchmark de arranque y memoria: json.load del catálogo frente a abrir el
+formato binario con mmap.
+
+Cada medición corre en un proceso nuevo para que el pico de memoria (RSS) no se
+mezcle entre casos. Se mide el tiempo hasta poder responder la primera búsqueda
+por nombre.
+
+Uso (desde el directorio public):
+    python benchmarks/bench_binario.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO)
+
+
+def generar(ruta_json, ruta_binario, n):
+    from codigofuente import guardar_juegos
+    from catalogo_binario import guardar_binario
+    rng = random.Random(3)
+    juegos = [{
+        'nombre': f'Juego {i}',
+        'categoria': rng.choice(['rompecabezas', 'deporte', 'acción']),
+        'precio': round(rng.uniform(1, 60), 2),
+        'licenciasDisponibles': rng.randrange(1000),
+        'licenciasVendidas': rng.randrange(1000)
+    } for i in range(n)]
+    guardar_juegos(juegos, ruta_json)
+    guardar_binario(juegos, ruta_binario)
+
+
+def medir(formato, ruta, nombre):
+    # Se ejecuta en el proceso hijo
+    inicio = time.perf_counter()
+    if formato == 'json':
+        from codigofuente import visualizar_detalle_juego
+        with open(ruta, 'r', encoding='utf-8') as f:
+            juegos = json.load(f)
+        juego = visualizar_detalle_juego(juegos, nombre)
+    else:
+        from catalogo_binario import abrir_binario
+        catalogo = abrir_binario(ruta)
+        juego = catalogo.buscar(nombre)
+    segundos = time.perf_counter() - inicio
+    assert juego is not None
+    print(json.dumps({'ms': segundos * 1000, 'rss_mb': pico_rss_mb()}))
+
+
+def pico_rss_mb():
+    # ru_maxrss se hereda del padre a través de fork/exec en Linux; VmHWM no
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def en_subproceso(formato, ruta, nombre):
+    salida = subprocess.run([sys.executable, __file__, '--medir', formato, ruta, nombre],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(salida)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--medir', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    directorio = tempfile.mkdtemp()
+    print(f'{"juegos":>10}{"json MB":>10}{"bin MB":>9}{"json ms":>10}{"bin ms":>9}{"json RSS":>11}{"bin RSS":>10}')
+    for n in args.sizes:
+        ruta_json = os.path.join(directorio, f'juegos_{n}.json')
+        ruta_binario = os.path.join(directorio, f'juegos_{n}.bin')
+        generar(ruta_json, ruta_binario, n)
+        nombre = f'juego {n // 2}'
+        j = en_subproceso('json', ruta_json, nombre)
+        b = en_subproceso('binario', ruta_binario, nombre)
+        print(f'{n:>10}{os.path.getsize(ruta_json) / 2**20:>10.1f}{os.path.getsize(ruta_binario) / 2**20:>9.1f}'
+              f'{j["ms"]:>10.1f}{b["ms"]:>9.2f}{j["rss_mb"]:>11.1f}{b["rss_mb"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark de pedidos por segundo: consultar_descuento_volumen (uno a uno) frente
+a la cotización por lotes con NumPy, verificando que los resultados coinciden.
+
+Uso (desde el directorio public):
+    python benchmarks/bench_cotizacion.py --juegos 10000 --pedidos 10000 --lineas 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigofuente import Catalogo, consultar_descuento_volumen
+from cotizacion_lote import CotizadorLote
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--juegos', type=int, default=10000)
+    parser.add_argument('--pedidos', type=int, default=10000)
+    parser.add_argument('--lineas', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    juegos = [{
+        'nombre': f'Juego {i}',
+        'categoria': rng.choice(['rompecabezas', 'deporte', 'acción']),
+        'precio': round(rng.uniform(1, 60), 2),
+        'licenciasDisponibles': 1000,
+        'licenciasVendidas': 0
+    } for i in range(args.juegos)]
+    pedidos = [[{'nombre_juego': f'Juego {rng.randrange(args.juegos)}', 'cantidad': rng.randrange(1, 15)}
+                for _ in range(args.lineas)] for _ in range(args.pedidos)]
+
+    print(f'{args.juegos} juegos, {args.pedidos} pedidos de {args.lineas} líneas')
+    for etiqueta, fuente in (('lista', juegos), ('Catalogo', Catalogo(juegos))):
+        # La versión escalar con lista hace una búsqueda lineal por línea: se limita la muestra
+        muestra = pedidos if etiqueta == 'Catalogo' else pedidos[:max(1, 2000000 // (args.juegos * args.lineas))]
+        inicio = time.perf_counter()
+        escalar = [consultar_descuento_volumen(fuente, p) for p in muestra]
+        escalar_s = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        lote = CotizadorLote(fuente).cotizar(pedidos)
+        lote_s = time.perf_counter() - inicio
+
+        assert lote[:len(escalar)] == escalar, 'los resultados no coinciden'
+        print(f'  {etiqueta:<9} escalar: {len(muestra) / escalar_s:>12.0f} pedidos/s'
+              f'   lote: {len(pedidos) / lote_s:>12.0f} pedidos/s (incluye construir el índice)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Microbenchmark de consultar_juego_mas_vendido / consultar_top_vendidos:
+recorrido de la lista completa frente al ranking incremental del Catalogo.
+
+Cada iteración compra licencias de un juego al azar y luego consulta el más
+vendido y el top 10, como haría el menú entre operaciones.
+
+Uso (desde el directorio public):
+    python benchmarks/bench_ranking.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codigofuente import Catalogo, comprar_licencias, consultar_juego_mas_vendido, consultar_top_vendidos
+
+CATEGORIAS = ['rompecabezas', 'deporte', 'acción']
+
+
+def generar(n):
+    rng = random.Random(7)
+    return [{
+        'nombre': f'Juego {i}',
+        'categoria': rng.choice(CATEGORIAS),
+        'precio': 10.0,
+        'licenciasDisponibles': 10 ** 9,
+        'licenciasVendidas': rng.randrange(1000)
+    } for i in range(n)]
+
+
+def medir(juegos, nombres, operaciones):
+    rng = random.Random(11)
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        comprar_licencias(juegos, rng.choice(nombres), rng.randrange(1, 50))
+        consultar_juego_mas_vendido(juegos)
+        consultar_top_vendidos(juegos, 10)
+    return (time.perf_counter() - inicio) / operaciones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--ops', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f'{"juegos":>10}{"lista µs/op":>14}{"catálogo µs/op":>17}{"construir ms":>15}')
+    for n in args.sizes:
+        nombres = [f'Juego {i}' for i in range(n)]
+        lista_us = medir(generar(n), nombres, args.ops)
+        inicio = time.perf_counter()
+        catalogo = Catalogo(generar(n))
+        construir_ms = (time.perf_counter() - inicio) * 1000
+        catalogo_us = medir(catalogo, nombres, args.ops)
+        print(f'{n:>10}{lista_us:>14.1f}{catalogo_us:>17.1f}{construir_ms:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+# catalogo_binario.py
+
+"""
+Formato binario compacto del catálogo, pensado para abrirse con mmap.
+
+Los campos numéricos se guardan por columnas (arrays de tamaño fijo), los textos
+en una tabla de cadenas sin repetir y los nombres tienen un índice ordenado para
+búsquedas por nombre sin decodificar el archivo. Abrir un catálogo solo lee la
+cabecera; cada registro se decodifica cuando se pide.
+
+Disposición (little endian, secciones alineadas a 8 bytes):
+  cabecera      magic, versión, n juegos, m cadenas y el offset de cada sección
+  precio        float64[n]
+  disponibles   int64[n]     licenciasDisponibles
+  vendidas      int64[n]     licenciasVendidas
+  nombre        uint32[n]    índice en la tabla de cadenas
+  categoria     uint32[n]    índice en la tabla de cadenas
+  extra         uint32[n]    otros campos del registro como JSON ('' si no hay)
+  indice        uint32[n]    posiciones ordenadas por nombre.casefold()
+  cadenas_pos   uint64[m+1]  inicio de cada cadena en el blob
+  cadenas       bytes        UTF-8 concatenado
+
+Uso:
+    python catalogo_binario.py a-binario data/juegos.json data/juegos.bin
+    python catalogo_binario.py a-json data/juegos.bin data/juegos.json
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from codigofuente import cargar_juegos, guardar_juegos
+
+MAGIC = b'JCAT'
+VERSION = 1
+CAMPOS = ('nombre', 'categoria', 'precio', 'licenciasDisponibles', 'licenciasVendidas')
+# magic, versión, n, m y offsets de: precio, disponibles, vendidas, nombre,
+# categoria, extra, indice, cadenas_pos, cadenas, fin
+CABECERA = struct.Struct('<4sIII10Q')
+
+
+def _alinear(buffer):
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+
+
+def guardar_binario(juegos, ruta):
+    """Escribe la lista de juegos en formato binario."""
+    cadenas = {}
+
+    def cadena(texto):
+        if texto not in cadenas:
+            cadenas[texto] = len(cadenas)
+        return cadenas[texto]
+
+    n = len(juegos)
+    precio = array('d', (float(j['precio']) for j in juegos))
+    disponibles = array('q', (j['licenciasDisponibles'] for j in juegos))
+    vendidas = array('q', (j.get('licenciasVendidas', 0) for j in juegos))
+    nombre = array('I', (cadena(j['nombre']) for j in juegos))
+    categoria = array('I', (cadena(j['categoria']) for j in juegos))
+    extra = array('I')
+    for j in juegos:
+        otros = {k: v for k, v in j.items() if k not in CAMPOS}
+        extra.append(cadena(json.dumps(otros, ensure_ascii=False) if otros else ''))
+    indice = array('I', sorted(range(n), key=lambda i: juegos[i]['nombre'].casefold()))
+
+    blob = bytearray()
+    posiciones = array('Q', [0])
+    for texto in cadenas:
+        blob.extend(texto.encode('utf-8'))
+        posiciones.append(len(blob))
+
+    cuerpo = bytearray(CABECERA.size)
+    _alinear(cuerpo)
+    offsets = []
+    for seccion in (precio, disponibles, vendidas, nombre, categoria, extra, indice, posiciones):
+        offsets.append(len(cuerpo))
+        cuerpo.extend(seccion.tobytes())
+        _alinear(cuerpo)
+    offsets.append(len(cuerpo))
+    cuerpo.extend(blob)
+    offsets.append(len(cuerpo))
+
+    CABECERA.pack_into(cuerpo, 0, MAGIC, VERSION, n, len(cadenas), *offsets)
+    with open(ruta, 'wb') as f:
+        f.write(cuerpo)
+
+
+class CatalogoBinario:
+    """
+    Catálogo de solo lectura sobre un archivo binario mapeado en memoria.
+    Se comporta como una secuencia de dicts que se decodifican al accederlos.
+    """
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, 'rb')
+        self._mmap = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n, m, *offsets) = CABECERA.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{ruta} no es un catálogo binario válido')
+        vista = self._vista = memoryview(self._mmap)
+        o = offsets
+        self.precio = vista[o[0]:o[0] + 8 * self.n].cast('d')
+        self.disponibles = vista[o[1]:o[1] + 8 * self.n].cast('q')
+        self.vendidas = vista[o[2]:o[2] + 8 * self.n].cast('q')
+        self._nombre = vista[o[3]:o[3] + 4 * self.n].cast('I')
+        self._categoria = vista[o[4]:o[4] + 4 * self.n].cast('I')
+        self._extra = vista[o[5]:o[5] + 4 * self.n].cast('I')
+        self._indice = vista[o[6]:o[6] + 4 * self.n].cast('I')
+        self._cadenas_pos = vista[o[7]:o[7] + 8 * (m + 1)].cast('Q')
+        self._cadenas = vista[o[8]:o[9]]
+
+    def cadena(self, i):
+        return str(self._cadenas[self._cadenas_pos[i]:self._cadenas_pos[i + 1]], 'utf-8')
+
+    def nombre(self, pos):
+        return self.cadena(self._nombre[pos])
+
+    def categoria(self, pos):
+        return self.cadena(self._categoria[pos])
+
+    def registro(self, pos):
+        """Decodifica un solo juego como dict, con los mismos campos que el JSON."""
+        juego = {
+            'nombre': self.nombre(pos),
+            'categoria': self.categoria(pos),
+            'precio': self.precio[pos],
+            'licenciasDisponibles': self.disponibles[pos],
+            'licenciasVendidas': self.vendidas[pos]
+        }
+        extra = self.cadena(self._extra[pos])
+        if extra:
+            juego.update(json.loads(extra))
+        return juego
+
+    def posicion(self, nombre):
+        """Posición del juego con ese nombre (sin distinguir mayúsculas), o None. O(log n)."""
+        clave = nombre.casefold()
+        inicio, fin = 0, self.n
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            if self.nombre(self._indice[medio]).casefold() < clave:
+                inicio = medio + 1
+            else:
+                fin = medio
+        if inicio < self.n and self.nombre(self._indice[inicio]).casefold() == clave:
+            return self._indice[inicio]
+        return None
+
+    def buscar(self, nombre):
+        pos = self.posicion(nombre)
+        return None if pos is None else self.registro(pos)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, pos):
+        if not 0 <= pos < self.n:
+            raise IndexError(pos)
+        return self.registro(pos)
+
+    def __iter__(self):
+        return (self.registro(pos) for pos in range(self.n))
+
+    def cerrar(self):
+        for vista in (self.precio, self.disponibles, self.vendidas, self._nombre, self._categoria,
+                      self._extra, self._indice, self._cadenas_pos, self._cadenas, self._vista):
+            vista.release()
+        self._mmap.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def abrir_binario(ruta):
+    """Abre un catálogo binario sin decodificar sus registros."""
+    return CatalogoBinario(ruta)
+
+
+def json_a_binario(ruta_json, ruta_binario):
+    """Convierte el catálogo JSON (con su diario de cambios aplicado) al formato binario."""
+    guardar_binario(cargar_juegos(ruta_json), ruta_binario)
+
+
+def binario_a_json(ruta_binario, ruta_json):
+    """Convierte un catálogo binario de vuelta al formato JSON."""
+    with abrir_binario(ruta_binario) as catalogo:
+        guardar_juegos(list(catalogo), ruta_json)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in ('a-binario', 'a-json'):
+        print('Uso: python catalogo_binario.py a-binario|a-json ORIGEN DESTINO')
+        sys.exit(1)
+    if sys.argv[1] == 'a-binario':
+        json_a_binario(sys.argv[2], sys.argv[3])
+    else:
+        binario_a_json(sys.argv[2], sys.argv[3])
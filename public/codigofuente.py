@@ -1,33 +1,218 @@
 # app.py
 
+import heapq
 import json
 import os
 import sys
 
+# Las reglas de descuento se comparten con el servidor (server/discount_rules.json)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'server'))
+from discount_rules import discount_rules
+
 DATA_PATH = os.path.join('data', 'juegos.json')
 
+# Diario de cambios de licencias junto al catálogo. Cada compra o devolución
+# agrega una línea con el estado nuevo del juego en vez de reescribir todo el JSON;
+# al cargar se aplica sobre la instantánea y al compactar se escribe una nueva.
+JOURNAL_SUFFIX = '.journal'
+COMPACTAR_BYTES = 1024 * 1024
+
+def ruta_diario(ruta=DATA_PATH):
+    return ruta + JOURNAL_SUFFIX
+
 def cargar_juegos(ruta=DATA_PATH):
-    """Carga el catálogo de juegos desde un JSON."""
-    if not os.path.exists(ruta):
-        return []
-    with open(ruta, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Carga el catálogo de juegos desde un JSON y le aplica el diario de cambios."""
+    juegos = []
+    if os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            juegos = json.load(f)
+    diario = ruta_diario(ruta)
+    if os.path.exists(diario):
+        por_nombre = {j['nombre']: j for j in juegos}
+        # Solo lectura: una última línea incompleta (caída durante la escritura) se
+        # ignora aquí y la descarta registrar_cambio antes de agregar la siguiente
+        with open(diario, 'rb') as f:
+            for linea in f:
+                try:
+                    if not linea.endswith(b'\n'):
+                        raise ValueError
+                    cambio = json.loads(linea)
+                except ValueError:
+                    break
+                juego = por_nombre.get(cambio['nombre'])
+                if juego is not None:
+                    juego['licenciasDisponibles'] = cambio['licenciasDisponibles']
+                    juego['licenciasVendidas'] = cambio['licenciasVendidas']
+    return juegos
+
+def _descartar_linea_incompleta(f):
+    """
+    Corta el diario (abierto en modo binario de lectura y escritura) después del
+    último salto de línea, para que el cambio siguiente empiece en una línea nueva.
+    Si el archivo ya termina en salto de línea solo se lee el último byte.
+    """
+    fin = f.seek(0, os.SEEK_END)
+    posicion = fin
+    while posicion > 0:
+        inicio = max(0, posicion - 4096)
+        f.seek(inicio)
+        bloque = f.read(posicion - inicio)
+        if posicion == fin and bloque.endswith(b'\n'):
+            return
+        salto = bloque.rfind(b'\n')
+        if salto >= 0:
+            f.truncate(inicio + salto + 1)
+            return
+        posicion = inicio
+    f.truncate(0)
 
 def guardar_juegos(juegos, ruta=DATA_PATH):
-    """Guarda el catálogo de juegos en el JSON."""
-    with open(ruta, 'w', encoding='utf-8') as f:
+    """
+    Guarda el catálogo completo (compactación): escribe un archivo temporal, lo
+    renombra atómicamente sobre el JSON y luego vacía el diario.
+    """
+    if isinstance(juegos, Catalogo):
+        juegos = juegos.juegos
+    directorio = os.path.dirname(ruta) or '.'
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
         json.dump(juegos, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    # Si se cae aquí, el diario se vuelve a aplicar sobre la instantánea nueva
+    # sin efecto: cada línea guarda valores absolutos, no incrementos.
+    if os.path.exists(ruta_diario(ruta)):
+        os.remove(ruta_diario(ruta))
+
+def registrar_cambio(juegos, juego, ruta=DATA_PATH):
+    """
+    Agrega al diario el estado de licencias de un juego modificado (O(1)) y
+    compacta el catálogo cuando el diario supera COMPACTAR_BYTES.
+    """
+    cambio = {
+        'nombre': juego['nombre'],
+        'licenciasDisponibles': juego['licenciasDisponibles'],
+        'licenciasVendidas': juego['licenciasVendidas']
+    }
+    with open(ruta_diario(ruta), 'ab+') as f:
+        _descartar_linea_incompleta(f)
+        f.write((json.dumps(cambio, ensure_ascii=False) + '\n').encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+        tamano = f.tell()
+    if tamano > COMPACTAR_BYTES:
+        guardar_juegos(juegos, ruta)
+
+class RankingVentas:
+    """
+    Ranking de juegos por licenciasVendidas con un heap de invalidación perezosa.
+    Cada cambio agrega una entrada nueva con la versión del juego; las entradas con
+    versión vieja se descartan al consultar. El top 1 cuesta O(log n) amortizado y
+    el top N, O(N log n). Los empates se resuelven por posición en el catálogo,
+    igual que max() sobre la lista.
+    """
+
+    def __init__(self, juegos_por_posicion):
+        self._juegos = dict(juegos_por_posicion)
+        self._version = {pos: 0 for pos in self._juegos}
+        self._heap = []
+        self._compactar()
+
+    def _compactar(self):
+        self._heap = [(-juego.get('licenciasVendidas', 0), pos, self._version[pos])
+                      for pos, juego in self._juegos.items()]
+        heapq.heapify(self._heap)
+
+    def actualizar(self, pos):
+        """Registra que cambiaron las licencias vendidas del juego en la posición pos."""
+        self._version[pos] += 1
+        juego = self._juegos[pos]
+        heapq.heappush(self._heap, (-juego.get('licenciasVendidas', 0), pos, self._version[pos]))
+        if len(self._heap) > 2 * len(self._juegos) + 64:
+            self._compactar()
+
+    def top(self, n):
+        """Los n juegos más vendidos, de mayor a menor."""
+        resultado = []
+        vigentes = []
+        while self._heap and len(resultado) < n:
+            entrada = heapq.heappop(self._heap)
+            if entrada[2] != self._version[entrada[1]]:
+                continue
+            vigentes.append(entrada)
+            resultado.append(self._juegos[entrada[1]])
+        for entrada in vigentes:
+            heapq.heappush(self._heap, entrada)
+        return resultado
+
+class Catalogo:
+    """
+    Catálogo indexado, construido una sola vez a partir de cargar_juegos.
+    Mantiene un índice nombre (casefold) -> juego y otro categoría -> juegos,
+    de modo que las búsquedas por nombre son O(1). Los juegos siguen siendo
+    los mismos dicts de la lista original, así que guardar_juegos(catalogo.juegos)
+    persiste los cambios.
+    Todas las funciones de requerimientos aceptan un Catalogo o una lista.
+    """
+
+    def __init__(self, juegos):
+        self.juegos = juegos
+        self.por_nombre = {}
+        self.categorias = {}
+        self._posiciones = {}
+        por_categoria = {}
+        for pos, juego in enumerate(juegos):
+            self.por_nombre.setdefault(juego['nombre'].casefold(), juego)
+            categoria = juego['categoria'].casefold()
+            self.categorias.setdefault(categoria, []).append(juego)
+            por_categoria.setdefault(categoria, []).append((pos, juego))
+            self._posiciones[id(juego)] = pos
+        self.ranking = RankingVentas(enumerate(juegos))
+        self.ranking_categoria = {cat: RankingVentas(items) for cat, items in por_categoria.items()}
+
+    def buscar(self, nombre):
+        return self.por_nombre.get(nombre.casefold())
+
+    def por_categoria(self, categoria):
+        return self.categorias.get(categoria.casefold(), [])
+
+    def registrar_venta(self, juego):
+        """Actualiza los rankings después de modificar licenciasVendidas de un juego."""
+        pos = self._posiciones[id(juego)]
+        self.ranking.actualizar(pos)
+        self.ranking_categoria[juego['categoria'].casefold()].actualizar(pos)
+
+    def mas_vendidos(self, n, categoria=None):
+        if categoria is None:
+            return self.ranking.top(n)
+        ranking = self.ranking_categoria.get(categoria.casefold())
+        return ranking.top(n) if ranking else []
+
+    def __iter__(self):
+        return iter(self.juegos)
+
+    def __len__(self):
+        return len(self.juegos)
 
 # --- Requerimiento 1 ---
 def visualizar_detalle_juego(juegos, nombre):
     """
     Nombre: visualizar_detalle_juego
     Parámetros:
-      - juegos (list of dict)
+      - juegos (list of dict | Catalogo)
       - nombre (str)
     Retorno:
       - dict con todos los atributos del juego, o None si no existe
     """
+    if isinstance(juegos, Catalogo):
+        return juegos.buscar(nombre)
     return next((j for j in juegos if j['nombre'].lower() == nombre.lower()), None)
 
 # --- Requerimiento 2 ---
@@ -35,7 +220,7 @@ def comprar_licencias(juegos, nombre, cantidad):
     """
     Nombre: comprar_licencias
     Parámetros:
-      - juegos (list of dict)
+      - juegos (list of dict | Catalogo)
       - nombre (str)
       - cantidad (int)
     Retorno:
@@ -48,18 +233,13 @@ def comprar_licencias(juegos, nombre, cantidad):
         return {'mensaje': 'Licencias insuficientes', 'juego_actualizado': juego}
 
     precio_total = juego['precio'] * cantidad
-    descuento = 0.0
-    cat = juego['categoria'].lower()
-    if cat == 'rompecabezas' and cantidad >= 25:
-        descuento = 0.20
-    elif cat == 'deporte' and cantidad >= 20:
-        descuento = 0.15
-    elif cat == 'acción' and cantidad >= 15:
-        descuento = 0.15
+    descuento = discount_rules.discount({juego['categoria']: cantidad}) / 100
 
     total_desc = precio_total * (1 - descuento)
     juego['licenciasDisponibles'] -= cantidad
     juego['licenciasVendidas'] += cantidad
+    if isinstance(juegos, Catalogo):
+        juegos.registrar_venta(juego)
 
     mensaje = (f"Compra exitosa: {cantidad} licencias de \"{juego['nombre']}\". "
                f"Total a pagar: ${total_desc:.2f} (Descuento: {int(descuento*100)}%).")
@@ -70,7 +250,7 @@ def vender_licencias(juegos, nombre, cantidad):
     """
     Nombre: vender_licencias
     Parámetros:
-      - juegos (list of dict)
+      - juegos (list of dict | Catalogo)
       - nombre (str)
       - cantidad (int)
     Retorno:
@@ -84,6 +264,8 @@ def vender_licencias(juegos, nombre, cantidad):
 
     juego['licenciasDisponibles'] += cantidad
     juego['licenciasVendidas'] -= cantidad
+    if isinstance(juegos, Catalogo):
+        juegos.registrar_venta(juego)
     mensaje = f"Venta/Devolución exitosa: {cantidad} licencias de \"{juego['nombre']}\"."
     return {'mensaje': mensaje, 'juego_actualizado': juego}
 
@@ -92,29 +274,50 @@ def consultar_juego_mas_vendido(juegos):
     """
     Nombre: consultar_juego_mas_vendido
     Parámetros:
-      - juegos (list of dict)
+      - juegos (list of dict | Catalogo)
     Retorno:
       - dict { nombre_juego: str|null, cantidad_vendida: int }
     """
-    if not juegos:
+    if not len(juegos):
         return {'nombre_juego': None, 'cantidad_vendida': 0}
-    mas_vendido = max(juegos, key=lambda j: j.get('licenciasVendidas', 0))
+    if isinstance(juegos, Catalogo):
+        mas_vendido = juegos.mas_vendidos(1)[0]
+    else:
+        mas_vendido = max(juegos, key=lambda j: j.get('licenciasVendidas', 0))
     return {
         'nombre_juego': mas_vendido['nombre'],
         'cantidad_vendida': mas_vendido.get('licenciasVendidas', 0)
     }
 
+def consultar_top_vendidos(juegos, n, categoria=None):
+    """
+    Nombre: consultar_top_vendidos
+    Parámetros:
+      - juegos (list of dict | Catalogo)
+      - n (int): cantidad de juegos a devolver
+      - categoria (str|None): limitar el ranking a una categoría
+    Retorno:
+      - list of { nombre_juego: str, cantidad_vendida: int }, de mayor a menor
+    """
+    if isinstance(juegos, Catalogo):
+        top = juegos.mas_vendidos(n, categoria)
+    else:
+        candidatos = [j for j in juegos
+                      if categoria is None or j['categoria'].casefold() == categoria.casefold()]
+        top = heapq.nlargest(n, candidatos, key=lambda j: j.get('licenciasVendidas', 0))
+    return [{'nombre_juego': j['nombre'], 'cantidad_vendida': j.get('licenciasVendidas', 0)} for j in top]
+
 # --- Requerimiento 5 ---
 def consultar_descuento_volumen(juegos, detalles):
     """
     Nombre: consultar_descuento_volumen
     Parámetros:
-      - juegos (list of dict)
+      - juegos (list of dict | Catalogo)
       - detalles (list of { nombre_juego: str, cantidad: int })
     Retorno:
       - dict { porcentaje_descuento: float, total_con_descuento: float }
     """
-    sum_cat = {'rompecabezas': 0, 'deporte': 0, 'acción': 0}
+    sum_cat = {}
     total_bruto = 0.0
 
     for item in detalles:
@@ -122,22 +325,16 @@ def consultar_descuento_volumen(juegos, detalles):
         if not juego:
             continue
         total_bruto += juego['precio'] * item['cantidad']
-        cat = juego['categoria'].lower()
-        if cat in sum_cat:
-            sum_cat[cat] += item['cantidad']
+        sum_cat[juego['categoria']] = sum_cat.get(juego['categoria'], 0) + item['cantidad']
 
-    descuento = 0.0
-    if sum_cat['rompecabezas'] >= 25:
-        descuento = 0.20
-    elif sum_cat['deporte'] >= 20 and sum_cat['acción'] >= 15:
-        descuento = 0.15
+    descuento = discount_rules.discount(sum_cat) / 100
 
     total_desc = total_bruto * (1 - descuento)
     return {'porcentaje_descuento': descuento, 'total_con_descuento': round(total_desc, 2)}
 
 # --- Interfaz de Línea de Comandos ---
 def menu():
-    juegos = cargar_juegos()
+    juegos = Catalogo(cargar_juegos())
     while True:
         print("\n--- Menú AppStore ---")
         print("1) Ver detalle de un juego")
@@ -161,14 +358,14 @@ def menu():
             res = comprar_licencias(juegos, n, c)
             print(res['mensaje'])
             if res['juego_actualizado']:
-                guardar_juegos(juegos)
+                registrar_cambio(juegos, res['juego_actualizado'])
         elif opt == '3':
             n = input("Nombre del juego: ").strip()
             c = int(input("Cantidad a devolver: "))
             res = vender_licencias(juegos, n, c)
             print(res['mensaje'])
             if res['juego_actualizado']:
-                guardar_juegos(juegos)
+                registrar_cambio(juegos, res['juego_actualizado'])
         elif opt == '4':
             mv = consultar_juego_mas_vendido(juegos)
             if mv['nombre_juego']:
@@ -187,6 +384,8 @@ def menu():
             print(f"Descuento: {int(dto['porcentaje_descuento']*100)}%")
             print(f"Total con descuento: ${dto['total_con_descuento']:.2f}")
         elif opt == '6':
+            if os.path.exists(ruta_diario()):
+                guardar_juegos(juegos)
             print("Saliendo...")
             sys.exit()
         else:
@@ -0,0 +1,107 @@
+# cotizacion_lote.py
+
+"""
+Cotización por lotes del descuento por volumen con NumPy.
+
+Para simular miles de pedidos a la vez: los nombres se convierten a índices
+del catálogo una sola vez y las sumas por categoría, los totales brutos y el
+nivel de descuento se calculan para todos los pedidos con operaciones sobre
+arrays. Las reglas son las mismas de consultar_descuento_volumen
+(discount_rules) y los resultados coinciden exactamente.
+"""
+
+import numpy as np
+
+from codigofuente import Catalogo, discount_rules
+
+
+class CotizadorLote:
+    """
+    Precios y categorías del catálogo en arrays, más el mapa nombre -> índice.
+    Se construye una vez y se reutiliza para cualquier cantidad de lotes.
+    """
+
+    def __init__(self, juegos):
+        if isinstance(juegos, Catalogo):
+            # Misma búsqueda que visualizar_detalle_juego con un Catalogo
+            self._clave = str.casefold
+            lista = juegos.juegos
+            indices = {id(j): i for i, j in enumerate(lista)}
+            self.indice = {nombre: indices[id(j)] for nombre, j in juegos.por_nombre.items()}
+        else:
+            self._clave = str.lower
+            lista = list(juegos)
+            self.indice = {}
+            for i, juego in enumerate(lista):
+                self.indice.setdefault(juego['nombre'].lower(), i)
+        self.precios = np.array([j['precio'] for j in lista], dtype=np.float64)
+        # Cada categoría distinta del catálogo es una columna; se normaliza al cotizar
+        # para usar siempre las reglas vigentes
+        codigos = {}
+        self.categorias = np.array([codigos.setdefault(j['categoria'], len(codigos)) for j in lista],
+                                   dtype=np.int64)
+        self.nombres_categoria = list(codigos)
+
+    def cotizar(self, pedidos):
+        """
+        Parámetros:
+          - pedidos (list of list of { nombre_juego: str, cantidad: int })
+        Retorno:
+          - list of { porcentaje_descuento: float, total_con_descuento: float },
+            uno por pedido y en el mismo orden
+        """
+        # Aplanar todas las líneas con el número de pedido de cada una
+        pedido_de_linea = []
+        juego_de_linea = []
+        cantidades = []
+        for p, detalles in enumerate(pedidos):
+            for item in detalles:
+                i = self.indice.get(self._clave(item['nombre_juego']))
+                if i is None:
+                    continue
+                pedido_de_linea.append(p)
+                juego_de_linea.append(i)
+                cantidades.append(item['cantidad'])
+
+        n = len(pedidos)
+        pedido_de_linea = np.array(pedido_de_linea, dtype=np.int64)
+        juego_de_linea = np.array(juego_de_linea, dtype=np.int64)
+        cantidades = np.array(cantidades, dtype=np.int64)
+
+        # bincount suma en el orden de las líneas, igual que el bucle escalar
+        brutos = np.bincount(pedido_de_linea, weights=self.precios[juego_de_linea] * cantidades, minlength=n)
+
+        sumas = np.zeros((n, len(self.nombres_categoria)), dtype=np.int64)
+        np.add.at(sumas, (pedido_de_linea, self.categorias[juego_de_linea]), cantidades)
+
+        # Suma por categoría normalizada de las columnas que usan las reglas
+        reglas = discount_rules.current()
+        columnas = {}
+        for c, nombre in enumerate(self.nombres_categoria):
+            columnas.setdefault(reglas.canonical(nombre), []).append(c)
+        ceros = np.zeros(n, dtype=np.int64)
+        totales_cat = {cat: sumas[:, columnas[cat]].sum(axis=1) if cat in columnas else ceros
+                       for cat in reglas.categories}
+
+        condiciones = [np.logical_and.reduce([totales_cat[cat] >= minimo for cat, minimo in condicion])
+                       for _, condicion in reglas.rules]
+        porcentajes = [porcentaje for porcentaje, _ in reglas.rules]
+        # np.select respeta el orden de prioridad: gana la primera condición verdadera
+        descuentos = np.select(condiciones, porcentajes, default=0) / 100 if condiciones else np.zeros(n)
+        totales = brutos * (1 - descuentos)
+
+        # round() de Python para redondear igual que la versión escalar
+        return [{'porcentaje_descuento': float(d), 'total_con_descuento': round(float(t), 2)}
+                for d, t in zip(descuentos.tolist(), totales.tolist())]
+
+
+def consultar_descuento_volumen_lote(juegos, pedidos):
+    """
+    Nombre: consultar_descuento_volumen_lote
+    Parámetros:
+      - juegos (list of dict | Catalogo)
+      - pedidos (list of list of { nombre_juego: str, cantidad: int })
+    Retorno:
+      - list of { porcentaje_descuento: float, total_con_descuento: float }
+    """
+    return CotizadorLote(juegos).cotizar(pedidos)
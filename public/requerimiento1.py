@@ -1,19 +1,6 @@
 # requerimiento2.py
 
-import json
-import os
-
-def cargar_juegos(ruta_archivo='data/juegos.json'):
-    """Carga el catálogo de juegos desde un archivo JSON."""
-    if not os.path.exists(ruta_archivo):
-        return []
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def guardar_juegos(juegos, ruta_archivo='data/juegos.json'):
-    """Guarda el catálogo de juegos en el archivo JSON."""
-    with open(ruta_archivo, 'w', encoding='utf-8') as f:
-        json.dump(juegos, f, ensure_ascii=False, indent=2)
+from codigofuente import cargar_juegos, registrar_cambio, discount_rules
 
 def comprar_licencias(juegos, nombre_juego, cantidad):
     """
@@ -27,10 +14,8 @@ def comprar_licencias(juegos, nombre_juego, cantidad):
           * mensaje (str): Confirmación o error.
           * juego_actualizado (dict|null): Juego modificado o None si no existe.
     Descripción:
-      Verifica stock, aplica descuento por volumen:
-        • 20% si categoría == 'rompecabezas' y cantidad ≥ 25
-        • 15% si categoría == 'deporte' y cantidad ≥ 20
-        • 15% si categoría == 'acción' y cantidad ≥ 15
+      Verifica stock, aplica el descuento por volumen de las reglas compartidas
+      (server/discount_rules.json) sobre la cantidad de esta compra.
       Actualiza licenciasDisponibles y licenciasVendidas.
     """
     # Buscar el juego
@@ -44,14 +29,7 @@ def comprar_licencias(juegos, nombre_juego, cantidad):
 
     # Calcular total y descuento
     precio_total = juego['precio'] * cantidad
-    descuento = 0.0
-    cat = juego['categoria'].lower()
-    if cat == 'rompecabezas' and cantidad >= 25:
-        descuento = 0.20
-    elif cat == 'deporte' and cantidad >= 20:
-        descuento = 0.15
-    elif cat == 'acción' and cantidad >= 15:
-        descuento = 0.15
+    descuento = discount_rules.discount({juego['categoria']: cantidad}) / 100
 
     total_con_descuento = precio_total * (1 - descuento)
 
@@ -80,5 +58,5 @@ if __name__ == '__main__':
     print("\n" + resultado['mensaje'])
 
     if resultado['juego_actualizado']:
-        guardar_juegos(juegos, ruta)
+        registrar_cambio(juegos, resultado['juego_actualizado'], ruta)
         print("Inventario actualizado correctamente.")
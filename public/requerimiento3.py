@@ -1,19 +1,6 @@
 # requerimiento3.py
 
-import json
-import os
-
-def cargar_juegos(ruta_archivo='data/juegos.json'):
-    """Carga el catálogo de juegos desde un archivo JSON."""
-    if not os.path.exists(ruta_archivo):
-        return []
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def guardar_juegos(juegos, ruta_archivo='data/juegos.json'):
-    """Guarda el catálogo de juegos en el archivo JSON."""
-    with open(ruta_archivo, 'w', encoding='utf-8') as f:
-        json.dump(juegos, f, ensure_ascii=False, indent=2)
+from codigofuente import cargar_juegos, registrar_cambio
 
 def vender_licencias(juegos, nombre_juego, cantidad):
     """
@@ -61,5 +48,5 @@ if __name__ == '__main__':
     print("\n" + resultado['mensaje'])
 
     if resultado['juego_actualizado']:
-        guardar_juegos(juegos, ruta)
+        registrar_cambio(juegos, resultado['juego_actualizado'], ruta)
         print("Inventario actualizado correctamente.")
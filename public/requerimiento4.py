@@ -1,14 +1,6 @@
 # requerimiento4.py
 
-import json
-import os
-
-def cargar_juegos(ruta_archivo='data/juegos.json'):
-    """Carga el catálogo de juegos desde un archivo JSON."""
-    if not os.path.exists(ruta_archivo):
-        return []
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from codigofuente import cargar_juegos
 
 def consultar_juego_mas_vendido(juegos):
     """
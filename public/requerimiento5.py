@@ -1,14 +1,6 @@
 # requerimiento5.py
 
-import json
-import os
-
-def cargar_juegos(ruta_archivo='data/juegos.json'):
-    """Carga el catálogo de juegos desde un archivo JSON."""
-    if not os.path.exists(ruta_archivo):
-        return []
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from codigofuente import cargar_juegos, discount_rules
 
 def consultar_descuento_volumen(juegos, detalles_compra):
     """
@@ -23,14 +15,15 @@ def consultar_descuento_volumen(juegos, detalles_compra):
           * porcentaje_descuento (float): 0.20, 0.15 o 0.0
           * total_con_descuento (float): Monto final tras aplicar el descuento
     Descripción:
-      Suma cantidades solicitadas por categoría y calcula:
+      Suma cantidades solicitadas por categoría y evalúa las reglas compartidas
+      (server/discount_rules.json) en orden de prioridad, p. ej.:
         1. Si rompecabezas >= 25 → descuento 20%
         2. Si deporte >= 20 y acción >= 15 → descuento 15%
       Solo la primera promoción que cumpla. Luego aplica el porcentaje
       al total bruto (precio * cantidad) y retorna el resultado.
     """
     # Inicializar sumas y total bruto
-    sum_por_categoria = {'rompecabezas': 0, 'deporte': 0, 'acción': 0}
+    sum_por_categoria = {}
     total_bruto = 0.0
 
     # Calcular totales
@@ -40,16 +33,11 @@ def consultar_descuento_volumen(juegos, detalles_compra):
         juego = next((j for j in juegos if j['nombre'].lower() == nombre.lower()), None)
         if juego:
             total_bruto += juego['precio'] * cantidad
-            cat = juego['categoria'].lower()
-            if cat in sum_por_categoria:
-                sum_por_categoria[cat] += cantidad
+            cat = juego['categoria']
+            sum_por_categoria[cat] = sum_por_categoria.get(cat, 0) + cantidad
 
     # Determinar porcentaje de descuento
-    descuento = 0.0
-    if sum_por_categoria['rompecabezas'] >= 25:
-        descuento = 0.20
-    elif sum_por_categoria['deporte'] >= 20 and sum_por_categoria['acción'] >= 15:
-        descuento = 0.15
+    descuento = discount_rules.discount(sum_por_categoria) / 100
 
     total_con_descuento = total_bruto * (1 - descuento)
 
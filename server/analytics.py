@@ -0,0 +1,121 @@
+from datetime import date
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from app import db, Game, GameSalesDaily
+from authz import admin_required
+
+analytics = Blueprint('analytics', __name__)
+
+
+def _sales_upsert(table):
+    """INSERT que suma licencias e ingresos si ya existe la fila (game_id, day), según la base."""
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        return statement.on_duplicate_key_update(
+            licenses=table.c.licenses + statement.inserted.licenses,
+            revenue=table.c.revenue + statement.inserted.revenue
+        )
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'El resumen de ventas no soporta la base {dialect}')
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.game_id, table.c.day],
+        set_={
+            'licenses': table.c.licenses + statement.excluded.licenses,
+            'revenue': table.c.revenue + statement.excluded.revenue
+        }
+    )
+
+
+def record_sales(lines, discount_percentage, day):
+    """
+    Suma las líneas de una compra al resumen diario (game_id, day) con un upsert.
+    Debe llamarse dentro de la transacción del checkout, antes del commit.
+    """
+    totals = {}
+    for game, quantity in lines:
+        licenses, revenue = totals.get(game.id, (0, 0))
+        net = game.price * quantity * (1 - discount_percentage / 100)
+        totals[game.id] = (licenses + quantity, revenue + net)
+
+    db.session.execute(_sales_upsert(GameSalesDaily.__table__), [
+        {'game_id': game_id, 'day': day, 'licenses': licenses, 'revenue': revenue}
+        for game_id, (licenses, revenue) in totals.items()
+    ])
+
+
+def _filtered(query):
+    # Filtros comunes: ?category=&from=YYYY-MM-DD&to=YYYY-MM-DD (ambos inclusive)
+    category = request.args.get('category', '')
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    if date_from:
+        query = query.filter(GameSalesDaily.day >= date.fromisoformat(date_from))
+    if date_to:
+        query = query.filter(GameSalesDaily.day <= date.fromisoformat(date_to))
+    if category:
+        query = query.join(Game, Game.id == GameSalesDaily.game_id).filter(Game.category == category)
+    return query
+
+
+@analytics.route('/analytics/top-games', methods=['GET'])
+@admin_required
+def top_games():
+    order_by = request.args.get('order_by', 'licenses')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        licenses = func.sum(GameSalesDaily.licenses).label('licenses')
+        revenue = func.sum(GameSalesDaily.revenue).label('revenue')
+        query = _filtered(db.session.query(GameSalesDaily.game_id, licenses, revenue))
+    except ValueError:
+        return jsonify({'error': 'Parámetros inválidos'}), 400
+    
+    ranking = query.group_by(GameSalesDaily.game_id)\
+        .order_by((revenue if order_by == 'revenue' else licenses).desc(), GameSalesDaily.game_id)\
+        .limit(limit)\
+        .subquery()
+    
+    # Nombres y categorías solo para los juegos del ranking
+    rows = db.session.query(ranking, Game.name, Game.category)\
+        .join(Game, Game.id == ranking.c.game_id)\
+        .order_by((ranking.c.revenue if order_by == 'revenue' else ranking.c.licenses).desc(), ranking.c.game_id)\
+        .all()
+    
+    return jsonify([{
+        'game_id': row.game_id,
+        'name': row.name,
+        'category': row.category,
+        'licenses': row.licenses,
+        'revenue': round(row.revenue, 2)
+    } for row in rows]), 200
+
+
+@analytics.route('/analytics/revenue', methods=['GET'])
+@admin_required
+def revenue():
+    try:
+        query = _filtered(db.session.query(
+            GameSalesDaily.day,
+            func.sum(GameSalesDaily.licenses).label('licenses'),
+            func.sum(GameSalesDaily.revenue).label('revenue')
+        ))
+    except ValueError:
+        return jsonify({'error': 'Parámetros inválidos'}), 400
+    
+    days = query.group_by(GameSalesDaily.day).order_by(GameSalesDaily.day).all()
+    
+    return jsonify({
+        'total_licenses': sum(d.licenses for d in days),
+        'total_revenue': round(sum(d.revenue for d in days), 2),
+        'days': [{
+            'day': d.day.isoformat(),
+            'licenses': d.licenses,
+            'revenue': round(d.revenue, 2)
+        } for d in days]
+    }), 200
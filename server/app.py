@@ -2,27 +2,110 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
 from datetime import timedelta
+import click
 import os
+import sqlite3
 
 # Crear aplicación Flask
 app = Flask(__name__)
 
 # Configurar CORS
-CORS(app, resources={r"/*": {"origins": "*"}})
+CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor', 'X-Total-Count'])
 
-# Configuración de la base de datos
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///games.db'
+# Configuración de la base de datos (se puede sobrescribir con variables de entorno)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///games.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_CACHE_SIZE_KB'] = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
 app.config['JWT_SECRET_KEY'] = 'dev-secret-key'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+app.config['CATALOG_CACHE_SIZE'] = 512
+app.config['CATALOG_CACHE_TTL'] = int(os.environ.get('CATALOG_CACHE_TTL', 60))
+app.config['ROLE_CACHE_TTL'] = int(os.environ.get('ROLE_CACHE_TTL', 60))
+app.config['USER_COUNT_CACHE_TTL'] = int(os.environ.get('USER_COUNT_CACHE_TTL', 30))
+app.config['BULK_IMPORT_CHUNK_SIZE'] = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 1000))
+app.config['BULK_USER_CHUNK_SIZE'] = int(os.environ.get('BULK_USER_CHUNK_SIZE', 500))
+app.config['BATCH_CHECKOUT_MAX_CARTS'] = int(os.environ.get('BATCH_CHECKOUT_MAX_CARTS', 500))
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+app.config['GZIP_ENABLED'] = os.environ.get('GZIP_ENABLED', '1') != '0'
+app.config['GZIP_MIN_SIZE'] = int(os.environ.get('GZIP_MIN_SIZE', 1024))
+app.config['QUERY_DIAGNOSTICS'] = os.environ.get('QUERY_DIAGNOSTICS', 'off')
+app.config['QUERY_REPEAT_THRESHOLD'] = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 100))
+app.config['SLOW_QUERY_LOG'] = os.environ.get('SLOW_QUERY_LOG', 'slow_queries.log')
+
+def engine_options(config):
+    """Opciones del engine de SQLAlchemy según la base de datos configurada."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # Base en memoria: cada conexión nueva sería una base distinta
+            return {}
+        # Reutilizar conexiones para no repetir los PRAGMA en cada request
+        options['poolclass'] = QueuePool
+        options['connect_args'] = {
+            'check_same_thread': False,
+            'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000
+        }
+    elif url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    elif url.get_backend_name() == 'mysql':
+        options['connect_args'] = {'init_command': f"SET SESSION max_execution_time={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL permite que las lecturas del catálogo sigan mientras un checkout hace commit
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']}")
+    cursor.execute(f"PRAGMA cache_size=-{app.config['SQLITE_CACHE_SIZE_KB']}")
+    cursor.execute(f"PRAGMA mmap_size={app.config['SQLITE_MMAP_SIZE']}")
+    cursor.close()
 
 # Inicializar extensiones
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
 
+# Tiempo, sentencias SQL y tiempo en la base por endpoint (expuesto en /api/metrics)
+from metrics import init_metrics
+init_metrics(app)
+
+# Compresión gzip de las respuestas JSON si el cliente la acepta
+from streaming import init_compression
+init_compression(app)
+
+# Detector de N+1 y log de consultas lentas, solo si QUERY_DIAGNOSTICS lo activa
+from query_diagnostics import init_query_diagnostics
+init_query_diagnostics(app)
+
 # Definir modelos
 class User(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_is_admin_id', 'is_admin', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -38,6 +121,12 @@ class User(db.Model):
         }
 
 class Game(db.Model):
+    __table_args__ = (
+        db.Index('ix_game_price', 'price'),
+        db.Index('ix_game_category_name', 'category', 'name'),
+        db.Index('ix_game_category_price', 'category', 'price'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     category = db.Column(db.String(50), nullable=False)
@@ -49,41 +138,107 @@ class Game(db.Model):
     min_stock = db.Column(db.Integer, default=5)
 
 class Transaction(db.Model):
+    __table_args__ = (
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
-    total = db.Column(db.Float, nullable=False)
+    total_amount = db.Column(db.Float, nullable=False)
+    discount_percentage = db.Column(db.Float, default=0)
+    transaction_type = db.Column(db.String(20), nullable=False)  # 'purchase' o 'refund'
 
 class TransactionDetail(db.Model):
+    __table_args__ = (
+        db.Index('ix_transaction_detail_transaction', 'transaction_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=False)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float, nullable=False)
 
+class GameSalesDaily(db.Model):
+    # Resumen de ventas por juego y día; checkout lo actualiza en la misma transacción
+    __tablename__ = 'game_sales_daily'
+    __table_args__ = (
+        db.Index('ix_game_sales_daily_day', 'day'),
+    )
+
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    licenses = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+class CatalogVersion(db.Model):
+    # Una sola fila (id=1); se incrementa en cada escritura del catálogo para invalidar
+    # las cachés de respuestas de todos los procesos
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Crea las tablas que falten y aplica las migraciones pendientes."""
+    from migrations import run_migrations
+    db.create_all()
+    applied = run_migrations()
+    for number, description in applied:
+        print(f'Migración {number} aplicada: {description}')
+    if not applied:
+        print('El esquema ya está actualizado')
+
+@app.cli.command('provision-users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']),
+              help='Formato del archivo; por defecto se deduce de la extensión')
+def provision_users_command(path, fmt):
+    """Da de alta los usuarios de un archivo NDJSON o CSV (name, email, password)."""
+    from game_io import iter_rows
+    from user_io import provision_users
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    with open(path, 'rb') as f:
+        inserted, errors, error_count = provision_users(iter_rows(f, fmt), app.config['BULK_USER_CHUNK_SIZE'])
+    for error in errors:
+        print(f"Fila {error['row']}: {error['error']}")
+    if error_count > len(errors):
+        print(f'... y {error_count - len(errors)} errores más')
+    print(f'{inserted} usuarios creados, {error_count} filas con errores')
+
 if __name__ == '__main__':
     # Importar blueprints
     from auth import auth
     from games import games
     from cart import cart
+    from analytics import analytics
+    from metrics import metrics
 
     # Registrar blueprints
     app.register_blueprint(auth, url_prefix='/api')
     app.register_blueprint(games, url_prefix='/api')
     app.register_blueprint(cart, url_prefix='/api')
+    app.register_blueprint(analytics, url_prefix='/api')
+    app.register_blueprint(metrics, url_prefix='/api')
 
     # Crear todas las tablas
     with app.app_context():
         db.create_all()
         
+        # Aplicar migraciones pendientes
+        from migrations import run_migrations
+        run_migrations()
+        
         # Crear usuario admin si no existe
         admin = User.query.filter_by(email='admin@example.com').first()
         if not admin:
-            from werkzeug.security import generate_password_hash
+            from passwords import hash_password
             admin = User(
                 name='Admin',
                 email='admin@example.com',
-                password=generate_password_hash('admin123'),
+                password=hash_password('admin123'),
                 is_admin=True
             )
             db.session.add(admin)
@@ -1,7 +1,14 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
-from werkzeug.security import generate_password_hash, check_password_hash
+import re
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import create_access_token
 from app import db, User
+from authz import admin_required, invalidate_role
+from passwords import hash_password, verify_password
+from pagination import parse_limit, fetch_page, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from game_io import detect_format, iter_rows
+from user_io import DEFAULT_CHUNK_SIZE, provision_users
+from user_directory import (TOTAL_COUNT_HEADER, count_users, filter_users, find_user_by_email,
+                            invalidate_user_counts, normalize_email, parse_is_admin)
 
 auth = Blueprint('auth', __name__)
 
@@ -13,8 +20,9 @@ def register():
     if not all(k in data for k in ['name', 'email', 'password']):
         return jsonify({'error': 'Faltan datos requeridos'}), 400
     
-    # Validar formato de email
-    if not re.match(r"[^@]+@[^@]+\.[^@]+", data['email']):
+    # Validar formato de email; se guarda en minúsculas
+    email = normalize_email(data['email'])
+    if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
         return jsonify({'error': 'Formato de email inválido'}), 400
     
     # Validar seguridad de contraseña
@@ -22,7 +30,7 @@ def register():
         return jsonify({'error': 'La contraseña debe tener al menos 8 caracteres'}), 400
     
     # Verificar si el email ya existe
-    if User.query.filter_by(email=data['email']).first():
+    if find_user_by_email(email):
         return jsonify({'error': 'El email ya está registrado'}), 400
     
     # Crear nuevo usuario
@@ -30,14 +38,15 @@ def register():
     is_first_user = User.query.count() == 0
     new_user = User(
         name=data['name'],
-        email=data['email'],
-        password=generate_password_hash(data['password']),
+        email=email,
+        password=hash_password(data['password']),
         is_admin=is_first_user
     )
     
     try:
         db.session.add(new_user)
         db.session.commit()
+        invalidate_user_counts()
         return jsonify({'message': 'Usuario registrado exitosamente'}), 201
     except Exception as e:
         db.session.rollback()
@@ -52,10 +61,18 @@ def login():
         return jsonify({'error': 'Datos incompletos'}), 400
     
     # Buscar usuario
-    user = User.query.filter_by(email=data['email']).first()
-    if not user or not check_password_hash(user.password, data['password']):
+    user = find_user_by_email(data['email'])
+    if not user:
+        return jsonify({'error': 'Credenciales inválidas'}), 401
+    valid, new_hash = verify_password(user.password, data['password'])
+    if not valid:
         return jsonify({'error': 'Credenciales inválidas'}), 401
     
+    # Actualizar hashes generados con un método o costo anterior
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
+    
     # Generar token con claims adicionales
     access_token = create_access_token(
         identity=user.id,
@@ -67,25 +84,22 @@ def login():
     }), 200
 
 @auth.route('/promote', methods=['POST'])
-@jwt_required()
+@admin_required
 def promote_to_admin():
-    # Verificar si el usuario actual es administrador
-    claims = get_jwt()
-    if not claims.get('is_admin', False):
-        return jsonify({'error': 'No autorizado'}), 403
-    
     data = request.get_json()
     if not data or not data.get('email'):
         return jsonify({'error': 'Email requerido'}), 400
     
     # Buscar usuario a promover
-    user = User.query.filter_by(email=data['email']).first()
+    user = find_user_by_email(data['email'])
     if not user:
         return jsonify({'error': 'Usuario no encontrado'}), 404
     
     # Promover usuario
     user.is_admin = True
     db.session.commit()
+    invalidate_role(user.id)
+    invalidate_user_counts()
     
     return jsonify({
         'message': 'Usuario promovido a administrador exitosamente',
@@ -94,33 +108,74 @@ def promote_to_admin():
 
 # Nuevo endpoint para promover usuario a admin
 @auth.route('/users/<int:user_id>/promote', methods=['PUT'])
-@jwt_required()
+@admin_required
 def promote_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'No autorizado'}), 403
     user = User.query.get(user_id)
     if not user:
         return jsonify({'error': 'Usuario no encontrado'}), 404
     user.is_admin = True
     db.session.commit()
+    invalidate_role(user.id)
+    invalidate_user_counts()
     return jsonify({'message': 'Usuario promovido a administrador'}), 200
 
 # Endpoint para listar usuarios (solo admin)
 @auth.route('/users', methods=['GET'])
-@jwt_required()
+@admin_required
 def list_users():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    if not user or not user.is_admin:
-        return jsonify({'error': 'No autorizado'}), 403
-    users = User.query.all()
-    return jsonify([
-        {
-            'id': u.id,
-            'name': u.name,
-            'email': u.email,
-            'is_admin': u.is_admin
-        } for u in users
-    ]), 200 
\ No newline at end of file
+    # Paginación por cursor (id) y filtros opcionales por prefijo de email y rol
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        cursor = decode_cursor(after) if after else None
+        cursor_id = int(cursor[0]) if cursor else None
+        is_admin = parse_is_admin(request.args.get('is_admin'))
+    except (ValueError, IndexError, TypeError):
+        return jsonify({'error': 'Parámetros de paginación inválidos'}), 400
+    email_prefix = request.args.get('email') or None
+
+    query = filter_users(db.session.query(User.id, User.name, User.email, User.is_admin),
+                         email_prefix, is_admin)
+    if cursor_id is not None:
+        query = query.filter(User.id > cursor_id)
+    query = query.order_by(User.id)
+
+    # El total se lee de la caché
+    users, has_more = fetch_page(query, limit)
+    headers = {TOTAL_COUNT_HEADER: str(count_users(email_prefix, is_admin))}
+    if has_more:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([users[-1].id])
+
+    return jsonify([{
+        'id': u.id,
+        'name': u.name,
+        'email': u.email,
+        'is_admin': u.is_admin
+    } for u in users]), 200, headers
+
+@auth.route('/users/bulk', methods=['POST'])
+@admin_required
+def bulk_provision_users():
+    # El cuerpo se lee como stream: NDJSON (un usuario por línea) o CSV con encabezado
+    fmt = detect_format(request.mimetype, request.args.get('format'))
+    if fmt is None:
+        return jsonify({'error': 'Formato no soportado, use NDJSON o CSV'}), 415
+
+    chunk_size = current_app.config.get('BULK_USER_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    try:
+        inserted, errors, error_count = provision_users(iter_rows(request.stream, fmt), chunk_size)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'El archivo debe estar codificado en UTF-8'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Error al registrar los usuarios'}), 500
+    finally:
+        # Los lotes anteriores a un error ya quedaron confirmados
+        invalidate_user_counts()
+
+    return jsonify({
+        'inserted': inserted,
+        'error_count': error_count,
+        'errors': errors
+    }), 200
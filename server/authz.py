@@ -0,0 +1,42 @@
+from functools import wraps
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from app import db, User
+from ttl_cache import TTLCache
+
+DEFAULT_ROLE_CACHE_TTL = 60
+ROLE_CACHE_MAX_SIZE = 1024
+
+
+# user_id -> is_admin
+role_cache = TTLCache(ROLE_CACHE_MAX_SIZE)
+
+
+def invalidate_role(user_id):
+    """Descarta el rol cacheado de un usuario; llamar después de cambiar is_admin."""
+    role_cache.invalidate(user_id)
+
+
+def is_admin_user(user_id):
+    """Rol del usuario desde la caché, consultando la base solo si no está o venció."""
+    is_admin = role_cache.get(user_id)
+    if is_admin is None:
+        row = db.session.query(User.is_admin).filter(User.id == user_id).first()
+        is_admin = bool(row and row.is_admin)
+        role_cache.put(user_id, is_admin, current_app.config.get('ROLE_CACHE_TTL', DEFAULT_ROLE_CACHE_TTL))
+    return is_admin
+
+
+def admin_required(view):
+    """
+    Exige un JWT de administrador. Confía en el claim firmado ``is_admin``; solo si el
+    token no lo trae o dice que no es admin (p. ej. lo promovieron después del login)
+    se consulta el rol en la caché.
+    """
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not get_jwt().get('is_admin', False) and not is_admin_user(get_jwt_identity()):
+            return jsonify({'error': 'No autorizado'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,284 @@
+"""
+Benchmark reproducible de la API con datos sintéticos.
+
+Crea una base SQLite temporal con el esquema migrado y la cantidad pedida de
+juegos, usuarios y transacciones (siempre con la misma semilla), y ejecuta cada
+endpoint con el cliente de pruebas de Flask o contra un servidor local. Para cada
+escenario reporta latencia p50/p95/p99, throughput y consultas SQL por request
+en JSON, para comparar corridas entre commits.
+
+Por defecto la caché de respuestas del catálogo queda desactivada para medir el
+camino completo hasta la base; --with-cache la activa.
+
+Uso (desde el directorio server):
+    python benchmarks/bench_api.py --games 50000 --transactions 20000 --output antes.json
+    python benchmarks/bench_api.py --server --requests 500
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from werkzeug.security import generate_password_hash
+from app import app, db, User, Game, Transaction, TransactionDetail
+from auth import auth
+from games import games
+from cart import cart
+from analytics import analytics
+from migrations import run_migrations
+
+WORDS = ['super', 'mega', 'puzzle', 'futbol', 'carrera', 'batalla', 'dragon', 'ninja',
+         'galaxia', 'castillo', 'zombie', 'tenis', 'golf', 'laberinto', 'pirata', 'robot']
+CATEGORIES = ['rompecabezas', 'deportes', 'accion']
+PASSWORD = 'password123'
+BENCH_EMAIL = 'bench0@example.com'
+
+
+def seed(n_games, n_users, n_transactions, hash_method, rng):
+    """Llena la base con filas sintéticas usando executemany."""
+    stored = generate_password_hash(PASSWORD, method=hash_method)
+    users = [{'name': f'Bench {i}', 'email': f'bench{i}@example.com', 'password': stored,
+              'is_admin': i == 0} for i in range(max(n_users, 1))]
+    game_rows = [{
+        'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+        'category': rng.choice(CATEGORIES),
+        'size_kb': 1024,
+        'price': round(rng.uniform(1, 60), 2),
+        'available_licenses': 10 ** 9,
+        'sold_licenses': 0,
+        'min_stock': 5,
+        'image_url': ''
+    } for i in range(n_games)]
+
+    start = datetime(2024, 1, 1)
+    transactions = []
+    details = []
+    for t in range(1, n_transactions + 1):
+        lines = [(rng.randrange(1, n_games + 1), rng.randrange(1, 5)) for _ in range(rng.randrange(1, 4))]
+        transactions.append({
+            'id': t,
+            # Los usuarios con id bajo concentran más compras, como el usuario del benchmark
+            'user_id': min(int(rng.paretovariate(1.2)), len(users)),
+            'date': start + timedelta(minutes=t),
+            'total_amount': 0.0,
+            'discount_percentage': 0,
+            'transaction_type': 'purchase'
+        })
+        for game_id, quantity in lines:
+            price = game_rows[game_id - 1]['price']
+            transactions[-1]['total_amount'] += price * quantity
+            details.append({'transaction_id': t, 'game_id': game_id, 'quantity': quantity, 'unit_price': price})
+
+    with db.engine.begin() as conn:
+        conn.execute(User.__table__.insert(), users)
+        conn.execute(Game.__table__.insert(), game_rows)
+        if transactions:
+            conn.execute(Transaction.__table__.insert(), transactions)
+            conn.execute(TransactionDetail.__table__.insert(), details)
+
+
+class TestClientDriver:
+    """Ejecuta requests en el mismo proceso con el cliente de pruebas de Flask."""
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def request(self, method, url, body=None, headers=None):
+        response = getattr(self.client, method)(url, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class ServerDriver:
+    """Levanta la aplicación en un servidor HTTP local y la llama con urllib."""
+
+    def __init__(self):
+        import logging
+        from werkzeug.serving import make_server
+        # El log de acceso por request distorsionaría las latencias
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+
+    def request(self, method, url, body=None, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base + url, data=data, method=method.upper(),
+                                         headers={'Content-Type': 'application/json', **(headers or {})})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def scenarios(args, rng, token):
+    """Lista de (nombre, generador de (método, url, cuerpo), cabeceras) en orden de ejecución."""
+    auth_header = {'Authorization': f'Bearer {token}'}
+
+    def cart_items():
+        return {'items': [{'game_id': rng.randrange(1, args.games + 1), 'quantity': rng.randrange(1, 4)}
+                          for _ in range(rng.randrange(1, 6))]}
+
+    def games_search():
+        term = rng.choice(WORDS)[:rng.randrange(3, 6)]
+        sort = rng.choice(['name', 'price', 'relevance'])
+        return 'get', f'/api/games?search={term}&sort_by={sort}&sort_order={rng.choice(["asc", "desc"])}', None
+
+    def games_category():
+        sort = rng.choice(['name', 'price'])
+        return 'get', f'/api/games?category={rng.choice(CATEGORIES)}&sort_by={sort}', None
+
+    return [
+        ('get_games', lambda: ('get', f'/api/games?sort_by={rng.choice(["name", "price"])}', None), {}),
+        ('get_games search', games_search, {}),
+        ('get_games category', games_category, {}),
+        ('get_game_details', lambda: ('get', f'/api/games/{rng.randrange(1, args.games + 1)}', None), {}),
+        ('calculate_cart', lambda: ('post', '/api/cart/calculate', cart_items()), auth_header),
+        ('checkout', lambda: ('post', '/api/cart/checkout', cart_items()), auth_header),
+        ('get_transactions', lambda: ('get', '/api/transactions?limit=20', None), auth_header),
+        ('login', lambda: ('post', '/api/login', {'email': BENCH_EMAIL, 'password': PASSWORD}), {}),
+    ]
+
+
+def percentile(sorted_values, p):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[p - 1]
+
+
+def measure(driver, make_request, headers, count, warmup, statements):
+    for _ in range(warmup):
+        driver.request(*make_request(), headers=headers)
+    latencies = []
+    errors = 0
+    statements[0] = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        method, url, body = make_request()
+        t0 = time.perf_counter()
+        status, _ = driver.request(method, url, body, headers)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if status >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': count,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(count / elapsed, 1),
+        'queries_per_request': round(statements[0] / count, 2)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=200, help='requests medidos por escenario')
+    parser.add_argument('--login-requests', type=int, default=20, help='el login es caro a propósito (PBKDF2)')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--server', action='store_true', help='usar un servidor HTTP local en vez del cliente de pruebas')
+    parser.add_argument('--with-cache', action='store_true', help='mantener la caché de respuestas del catálogo')
+    parser.add_argument('--output', help='archivo donde escribir el JSON (por defecto, la salida estándar)')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_api.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['PASSWORD_HASH_WORKERS'] = 0
+    if not args.with_cache:
+        app.config['CATALOG_CACHE_SIZE'] = 0
+    for blueprint in (auth, games, cart, analytics):
+        app.register_blueprint(blueprint, url_prefix='/api')
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        seed(args.games, args.users, args.transactions, app.config['PASSWORD_HASH_METHOD'], rng)
+        run_migrations()
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        seed_seconds = time.perf_counter() - start
+        engine = db.engine
+
+    statements = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    driver = ServerDriver() if args.server else TestClientDriver()
+    status, body = driver.request('post', '/api/login', {'email': BENCH_EMAIL, 'password': PASSWORD})
+    if status != 200:
+        raise SystemExit(f'No se pudo iniciar sesión para el benchmark: {status} {body[:200]!r}')
+    token = json.loads(body)['access_token']
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    results = {}
+    try:
+        for name, make_request, headers in scenarios(args, rng, token):
+            count = args.login_requests if name == 'login' else args.requests
+            results[name] = measure(driver, make_request, headers, count, min(args.warmup, count), statements)
+            print(f'{name:<20} p50 {results[name]["p50_ms"]:>8.2f} ms  p99 {results[name]["p99_ms"]:>8.2f} ms  '
+                  f'{results[name]["throughput_rps"]:>8.1f} req/s  {results[name]["queries_per_request"]:>5.1f} sql/req',
+                  file=sys.stderr)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+        if args.server:
+            driver.close()
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'config': {
+            'games': args.games,
+            'users': args.users,
+            'transactions': args.transactions,
+            'requests': args.requests,
+            'login_requests': args.login_requests,
+            'seed': args.seed,
+            'driver': 'server' if args.server else 'test_client',
+            'catalog_cache': args.with_cache,
+            'password_hash_method': app.config['PASSWORD_HASH_METHOD'],
+            'seed_seconds': round(seed_seconds, 2)
+        },
+        'endpoints': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
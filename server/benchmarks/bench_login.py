@@ -0,0 +1,77 @@
+"""
+Benchmark de logins por segundo con distintos costos de PBKDF2.
+
+Para cada costo crea usuarios con hashes de ese costo y lanza varios hilos que
+hacen login en paralelo con el cliente de pruebas de Flask.
+
+Uso (desde el directorio server):
+    python benchmarks/bench_login.py --costs 50000 260000 600000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+from app import app, db, User
+from auth import auth
+
+PASSWORD = 'password123'
+
+
+def worker(emails, results):
+    client = app.test_client()
+    for email in emails:
+        response = client.post('/api/login', json={'email': email, 'password': PASSWORD})
+        results.append(response.status_code)
+
+
+def run(cost, threads, logins):
+    method = f'pbkdf2:sha256:{cost}'
+    app.config['PASSWORD_HASH_METHOD'] = method
+    with app.app_context():
+        stored = generate_password_hash(PASSWORD, method=method)
+        emails = [f'user{cost}_{i}@example.com' for i in range(threads)]
+        db.session.add_all([User(name='Bench', email=e, password=stored) for e in emails])
+        db.session.commit()
+
+    results = []
+    per_thread = logins // threads
+    pool = [threading.Thread(target=worker, args=([email] * per_thread, results)) for email in emails]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ok = results.count(200)
+    print(f'{cost:>10}{ok / elapsed:>12.1f}{len(results) - ok:>10}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--costs', type=int, nargs='+', default=[50000, 150000, 260000, 600000])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='procesos del pool de hash (0 = en el hilo del request)')
+    args = parser.parse_args()
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login.db')}"
+    app.config['PASSWORD_HASH_WORKERS'] = args.workers
+    app.register_blueprint(auth, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+
+    print(f'workers={args.workers} hilos={args.threads}')
+    print(f'{"costo":>10}{"logins/s":>12}{"errores":>10}')
+    for cost in args.costs:
+        run(cost, args.threads, args.logins)
+
+
+if __name__ == '__main__':
+    main()
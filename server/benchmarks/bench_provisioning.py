@@ -0,0 +1,94 @@
+"""
+Benchmark del alta de usuarios: llamadas a /api/register contra /api/users/bulk.
+
+Registra la misma cantidad de usuarios de las dos formas sobre bases nuevas y
+mide el tiempo total y las sentencias SQL ejecutadas. El alta masiva calcula
+los hashes en el pool de procesos (PASSWORD_HASH_WORKERS), así que la mejora
+crece con la cantidad de CPUs.
+
+Uso (desde el directorio server):
+    python benchmarks/bench_provisioning.py --users 500 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import app, db
+from auth import auth
+
+PASSWORD = 'password123'
+
+
+def fresh_database():
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'provisioning.db')}"
+    with app.app_context():
+        db.engine.dispose()
+        db.create_all()
+        return db.engine
+
+
+def count_statements(engine, fn):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    start = time.perf_counter()
+    try:
+        fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return time.perf_counter() - start, len(statements)
+
+
+def run_register(client, users):
+    def register_all():
+        for user in users:
+            response = client.post('/api/register', json=user)
+            assert response.status_code == 201, response.get_json()
+    return register_all
+
+
+def run_bulk(client, users):
+    body = ''.join(json.dumps(user) + '\n' for user in users)
+    with app.app_context():
+        token = create_access_token(identity=0, additional_claims={'is_admin': True})
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/x-ndjson'}
+
+    def bulk():
+        response = client.post('/api/users/bulk', data=body, headers=headers)
+        assert response.get_json()['inserted'] == len(users), response.get_json()
+    return bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='procesos del pool de hash (0 = en el hilo del request)')
+    args = parser.parse_args()
+
+    app.config['PASSWORD_HASH_WORKERS'] = args.workers
+    app.register_blueprint(auth, url_prefix='/api')
+    client = app.test_client()
+    users = [{'name': f'Cliente {i}', 'email': f'cliente{i}@example.com', 'password': PASSWORD}
+             for i in range(args.users)]
+
+    print(f'{args.users} usuarios, workers={args.workers}')
+    print(f'{"método":<12}{"segundos":>10}{"usuarios/s":>12}{"sentencias":>12}')
+    for name, runner in (('register', run_register), ('bulk', run_bulk)):
+        engine = fresh_database()
+        elapsed, statements = count_statements(engine, runner(client, users))
+        print(f'{name:<12}{elapsed:>10.2f}{args.users / elapsed:>12.1f}{statements:>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de búsqueda por nombre: ILIKE '%term%' frente al índice FTS5.
+
+Para cada término mide la primera página de 50 resultados ordenada por nombre
+(pág) y por relevancia (rel), y el conteo total de coincidencias (cnt).
+
+Uso (desde el directorio server):
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Game
+from search import ensure_search_index, search_matches
+
+WORDS = ['super', 'mega', 'puzzle', 'futbol', 'carrera', 'batalla', 'dragon', 'ninja',
+         'galaxia', 'castillo', 'zombie', 'tenis', 'golf', 'laberinto', 'pirata', 'robot']
+CATEGORIES = ['rompecabezas', 'deportes', 'accion']
+TERMS = ['drag', 'futbol', 'ninja robot', 'zz']
+
+
+def seed(n):
+    rng = random.Random(42)
+    rows = [{
+        'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+        'category': rng.choice(CATEGORIES),
+        'size_kb': 1024,
+        'price': round(rng.uniform(1, 60), 2),
+        'available_licenses': 100,
+        'sold_licenses': 0,
+        'min_stock': 5
+    } for i in range(n)]
+    with db.engine.begin() as conn:
+        conn.execute(Game.__table__.insert(), rows)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def ilike_page(term):
+    return Game.query.filter(Game.name.ilike(f'%{term}%')).order_by(Game.name).limit(50).all()
+
+
+def fts_page(term, by_relevance=False):
+    matches = search_matches(term)
+    order = matches.c.rank if by_relevance else Game.name
+    return Game.query.join(matches, matches.c.game_id == Game.id).order_by(order).limit(50).all()
+
+
+def ilike_count(term):
+    return Game.query.filter(Game.name.ilike(f'%{term}%')).count()
+
+
+def fts_count(term):
+    matches = search_matches(term)
+    return db.session.query(matches.c.game_id).count()
+
+
+def run(n, repeat):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    with app.app_context():
+        db.create_all()
+        seed(n)
+        start = time.perf_counter()
+        ensure_search_index()
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f'\n{n} juegos (índice construido en {build_ms:.0f} ms)')
+        print(f'{"término":<14}{"ILIKE pág":>11}{"FTS pág":>11}{"FTS rel":>11}'
+              f'{"ILIKE cnt":>11}{"FTS cnt":>11}   (ms)')
+        for term in TERMS:
+            print(f'{term:<14}'
+                  f'{timed(lambda: ilike_page(term), repeat):>11.2f}'
+                  f'{timed(lambda: fts_page(term), repeat):>11.2f}'
+                  f'{timed(lambda: fts_page(term, by_relevance=True), repeat):>11.2f}'
+                  f'{timed(lambda: ilike_count(term), repeat):>11.2f}'
+                  f'{timed(lambda: fts_count(term), repeat):>11.2f}')
+        db.session.remove()
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
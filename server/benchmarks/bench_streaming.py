@@ -0,0 +1,122 @@
+"""
+Benchmark de la página de GET /api/users: jsonify contra array JSON en streaming.
+
+Las dos variantes leen la misma página (las mismas filas, con ``fetch_page``) y
+solo cambian la forma de enviarla: el endpoint real arma el cuerpo con jsonify
+y el de comparación lo transmite en fragmentos de ~64 KB con
+stream_with_context y transferencia chunked. Se mide, con y sin gzip, el tiempo
+hasta el primer byte, el tiempo total, la memoria pico (tracemalloc, en una
+pasada aparte) y el tamaño del cuerpo, como promedio de varias repeticiones.
+
+Uso (desde el directorio server):
+    python benchmarks/bench_streaming.py --users 10000 --limits 50 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import json, request, stream_with_context
+from flask_jwt_extended import create_access_token
+from app import app, db, User
+from auth import auth
+from authz import admin_required
+from pagination import parse_limit, fetch_page
+
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_json_array(items, chunk_bytes=CHUNK_BYTES):
+    # Variante en streaming, solo para comparar
+    parts = ['[']
+    size = 1
+    separator = ''
+    for item in items:
+        text = separator + json.dumps(item, separators=(',', ':'))
+        separator = ','
+        parts.append(text)
+        size += len(text)
+        if size >= chunk_bytes:
+            yield ''.join(parts).encode('utf-8')
+            parts = []
+            size = 0
+    parts.append(']')
+    yield ''.join(parts).encode('utf-8')
+
+
+@app.route('/api/users-stream', methods=['GET'])
+@admin_required
+def list_users_stream():
+    query = db.session.query(User.id, User.name, User.email, User.is_admin).order_by(User.id)
+    users, _ = fetch_page(query, parse_limit(request.args.get('limit')))
+    items = ({'id': u.id, 'name': u.name, 'email': u.email, 'is_admin': u.is_admin} for u in users)
+    return app.response_class(stream_with_context(iter_json_array(items)), mimetype='application/json')
+
+
+def seed(n):
+    rows = [{'name': f'Usuario {i}', 'email': f'usuario{i}@example.com', 'password': 'x', 'is_admin': i == 0}
+            for i in range(n)]
+    with db.engine.begin() as conn:
+        conn.execute(User.__table__.insert(), rows)
+
+
+def read(client, url, headers):
+    start = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks)
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    for chunk in chunks:
+        size += len(chunk)
+    response.close()
+    return ttfb * 1000, (time.perf_counter() - start) * 1000, size / 1024
+
+
+def measure(client, url, headers, repeat):
+    # Los tiempos se miden sin tracemalloc, que hace mucho más lenta la ejecución
+    read(client, url, headers)
+    results = [read(client, url, headers) for _ in range(repeat)]
+    ttfb = sum(r[0] for r in results) / repeat
+    total = sum(r[1] for r in results) / repeat
+    tracemalloc.start()
+    read(client, url, headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ttfb, total, peak / 1024, results[0][2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--limits', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    app.register_blueprint(auth, url_prefix='/api')
+
+    path = os.path.join(tempfile.mkdtemp(), 'streaming.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    with app.app_context():
+        db.create_all()
+        seed(args.users)
+        token = create_access_token(identity=1, additional_claims={'is_admin': True})
+        db.session.remove()
+    client = app.test_client()
+
+    print(f'{args.users} usuarios, {args.repeat} repeticiones')
+    print(f'{"variante":<10}{"filas":>7}{"gzip":>6}{"TTFB ms":>10}{"total ms":>10}{"pico KB":>10}{"cuerpo KB":>11}')
+    for limit in args.limits:
+        for name, path in (('jsonify', '/api/users'), ('stream', '/api/users-stream')):
+            for encoding in ('identity', 'gzip'):
+                headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': encoding}
+                ttfb, total, peak, size = measure(client, f'{path}?limit={limit}', headers, args.repeat)
+                print(f'{name:<10}{limit:>7}{"sí" if encoding == "gzip" else "no":>6}'
+                      f'{ttfb:>10.2f}{total:>10.2f}{peak:>10.1f}{size:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Comprueba con EXPLAIN QUERY PLAN que las consultas de cada endpoint usan índices.
+
+Crea una base temporal con el esquema migrado, ejecuta los endpoints con el cliente
+de pruebas de Flask, captura cada SELECT emitido y analiza su plan. Termina con
+código 1 si alguna consulta recorre una tabla completa (SCAN sin índice).
+
+Uso (desde el directorio server):
+    python benchmarks/check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+from werkzeug.security import generate_password_hash
+from app import app, db, User, Game
+from auth import auth
+from games import games
+from cart import cart
+from analytics import analytics
+from migrations import run_migrations
+from pagination import encode_cursor
+
+# (descripción, método, url, cuerpo JSON)
+ENDPOINT_CALLS = [
+    ('get_games', 'get', '/api/games', None),
+    ('get_games precio desc', 'get', '/api/games?sort_by=price&sort_order=desc', None),
+    ('get_games categoría', 'get', '/api/games?category=accion', None),
+    ('get_games categoría + precio', 'get', '/api/games?category=accion&sort_by=price', None),
+    ('get_games búsqueda', 'get', '/api/games?search=juego', None),
+    ('get_games relevancia', 'get', '/api/games?search=juego&sort_by=relevance', None),
+    ('get_game_details', 'get', '/api/games/1', None),
+    ('calculate_cart', 'post', '/api/cart/calculate', {'items': [{'game_id': 1, 'quantity': 1}, {'game_id': 2, 'quantity': 1}]}),
+    ('checkout', 'post', '/api/cart/checkout', {'items': [{'game_id': 1, 'quantity': 1}, {'game_id': 2, 'quantity': 1}]}),
+    ('get_transactions', 'get', '/api/transactions?limit=1', None),
+    ('top_games', 'get', '/api/analytics/top-games?from=2000-01-01', None),
+    ('revenue', 'get', '/api/analytics/revenue?from=2000-01-01&category=accion', None),
+    ('list_users siguiente página', 'get', f'/api/users?limit=10&after={encode_cursor([1])}', None),
+    ('list_users prefijo de email', 'get', '/api/users?email=plan', None),
+    ('list_users admins', 'get', '/api/users?is_admin=true', None),
+    ('login', 'post', '/api/login', {'email': 'plan@example.com', 'password': 'password123'}),
+]
+
+
+def setup():
+    path = os.path.join(tempfile.mkdtemp(), 'plans.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    for blueprint in (auth, games, cart, analytics):
+        app.register_blueprint(blueprint, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        user = User(name='Plan', email='plan@example.com',
+                    password=generate_password_hash('password123'), is_admin=True)
+        db.session.add(user)
+        # Suficientes usuarios para que ANALYZE refleje un directorio real
+        db.session.execute(User.__table__.insert(), [
+            {'name': f'Usuario {i}', 'email': f'usuario{i}@example.com', 'password': 'x', 'is_admin': i % 50 == 0}
+            for i in range(500)
+        ])
+        for i in range(200):
+            db.session.add(Game(name=f'Juego {i}', category=['accion', 'deportes', 'rompecabezas'][i % 3],
+                                size_kb=1024, price=float(i % 40), available_licenses=1000, sold_licenses=0))
+        db.session.commit()
+        db.session.execute(text('ANALYZE'))
+        return create_access_token(identity=user.id, additional_claims={'is_admin': True})
+
+
+def main():
+    token = setup()
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    failures = 0
+
+    for description, method, url, body in ENDPOINT_CALLS:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            # Las consultas al catálogo de SQLite (sqlite_master) no cuentan
+            if (statement.lstrip().upper().startswith('SELECT') and not executemany
+                    and 'sqlite_master' not in statement):
+                statements.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', capture)
+        response = getattr(client, method)(url, headers=headers, json=body)
+        # Las respuestas en streaming ejecutan sus consultas al consumir el cuerpo
+        response.get_data()
+        response.close()
+        event.remove(engine, 'before_cursor_execute', capture)
+
+        print(f'\n{description} ({response.status_code})')
+        raw = engine.raw_connection()
+        try:
+            for statement, parameters in statements:
+                plan = raw.cursor().execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+                for row in plan:
+                    detail = row[-1]
+                    # Recorrer una subconsulta ya materializada (anon_N) no toca tablas
+                    full_scan = (detail.startswith('SCAN') and 'INDEX' not in detail
+                                 and 'VIRTUAL TABLE' not in detail and not detail.startswith('SCAN anon_'))
+                    failures += full_scan
+                    print(f'  {"FALLO " if full_scan else ""}{detail}')
+        finally:
+            raw.close()
+
+    if failures:
+        print(f'\n{failures} consultas recorren tablas completas')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
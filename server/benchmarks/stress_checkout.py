@@ -0,0 +1,94 @@
+"""
+Prueba de estrés de checkout concurrente: varios hilos compran el mismo juego con
+stock limitado y se verifica que nunca se venden más licencias de las disponibles.
+
+Uso (desde el directorio server):
+    python benchmarks/stress_checkout.py --threads 16 --checkouts 50 --stock 500
+
+Termina con código 1 si detecta sobreventa o inventario inconsistente.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from app import app, db, User, Game, TransactionDetail
+from cart import cart
+
+QUANTITY = 3
+
+
+def setup(stock):
+    path = os.path.join(tempfile.mkdtemp(), 'stress.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.register_blueprint(cart, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        user = User(name='Stress', email='stress@example.com', password='-')
+        game = Game(name='Lanzamiento', category='accion', size_kb=1024, price=10.0,
+                    available_licenses=stock, sold_licenses=0)
+        db.session.add_all([user, game])
+        db.session.commit()
+        return create_access_token(identity=user.id), game.id
+
+
+def worker(token, game_id, checkouts, results):
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    for _ in range(checkouts):
+        response = client.post('/api/cart/checkout', headers=headers,
+                               json={'items': [{'game_id': game_id, 'quantity': QUANTITY}]})
+        results.append(response.status_code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--checkouts', type=int, default=50, help='checkouts por hilo')
+    parser.add_argument('--stock', type=int, default=500)
+    args = parser.parse_args()
+
+    token, game_id = setup(args.stock)
+    results = []
+    threads = [threading.Thread(target=worker, args=(token, game_id, args.checkouts, results))
+               for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        game = Game.query.get(game_id)
+        detail_total = db.session.query(func.coalesce(func.sum(TransactionDetail.quantity), 0)).scalar()
+
+    ok = results.count(200)
+    expected_ok = min(args.threads * args.checkouts, args.stock // QUANTITY)
+    print(f'checkouts: {len(results)} en {elapsed:.2f} s ({len(results) / elapsed:.0f}/s), '
+          f'exitosos: {ok}, rechazados: {len(results) - ok}')
+    print(f'stock final: {game.available_licenses}, vendidas: {game.sold_licenses}, '
+          f'en detalles: {detail_total}')
+
+    errors = []
+    if game.available_licenses < 0:
+        errors.append('stock negativo')
+    if game.available_licenses + game.sold_licenses != args.stock:
+        errors.append('disponibles + vendidas no coincide con el stock inicial')
+    if game.sold_licenses != ok * QUANTITY or detail_total != game.sold_licenses:
+        errors.append('las licencias vendidas no coinciden con las compras exitosas')
+    if ok != expected_ok:
+        errors.append(f'se esperaban {expected_ok} compras exitosas')
+    for error in errors:
+        print(f'ERROR: {error}')
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
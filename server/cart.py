@@ -1,29 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, or_, and_
 from app import db, Game, Transaction, TransactionDetail
+from analytics import record_sales
+from catalog_cache import bump_catalog_version
+from pricing import load_games, price_cart, reserve_stock, CartError
+from pagination import parse_limit, fetch_page, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from query_diagnostics import allow_repeated_queries
 
 cart = Blueprint('cart', __name__)
 
-def calculate_discount(items):
-    # Agrupar licencias por categoría
-    category_licenses = {}
-    for item in items:
-        game = Game.query.get(item['game_id'])
-        if game:
-            category_licenses[game.category] = category_licenses.get(game.category, 0) + item['quantity']
-    
-    # Aplicar reglas de descuento
-    discount = 0
-    if category_licenses.get('rompecabezas', 0) >= 25:
-        discount = 20
-    elif (category_licenses.get('deportes', 0) >= 20 and 
-          category_licenses.get('accion', 0) >= 15):
-        discount = 15
-    
-    return discount
-
 @cart.route('/cart/calculate', methods=['POST'])
 @jwt_required()
 def calculate_cart():
@@ -33,28 +20,17 @@ def calculate_cart():
     if not items:
         return jsonify({'error': 'El carrito está vacío'}), 400
     
-    # Calcular subtotal y verificar disponibilidad
-    subtotal = 0
-    for item in items:
-        game = Game.query.get(item['game_id'])
-        if not game:
-            return jsonify({'error': f'Juego no encontrado: {item["game_id"]}'}), 404
-        
-        if item['quantity'] > game.available_licenses:
-            return jsonify({'error': f'No hay suficientes licencias disponibles para {game.name}'}), 400
-        
-        subtotal += game.price * item['quantity']
-    
-    # Calcular descuento
-    discount_percentage = calculate_discount(items)
-    discount_amount = (subtotal * discount_percentage) / 100
-    total = subtotal - discount_amount
+    # Calcular subtotal, descuento y verificar disponibilidad
+    try:
+        quote = price_cart(items)
+    except CartError as e:
+        return jsonify({'error': e.message}), e.status
     
     return jsonify({
-        'subtotal': subtotal,
-        'discount_percentage': discount_percentage,
-        'discount_amount': discount_amount,
-        'total': total
+        'subtotal': quote['subtotal'],
+        'discount_percentage': quote['discount_percentage'],
+        'discount_amount': quote['discount_amount'],
+        'total': quote['total']
     }), 200
 
 @cart.route('/cart/checkout', methods=['POST'])
@@ -68,52 +44,42 @@ def checkout():
         return jsonify({'error': 'El carrito está vacío'}), 400
     
     # Verificar disponibilidad y calcular totales
-    subtotal = 0
-    for item in items:
-        game = Game.query.get(item['game_id'])
-        if not game:
-            return jsonify({'error': f'Juego no encontrado: {item["game_id"]}'}), 404
-        
-        if item['quantity'] > game.available_licenses:
-            return jsonify({'error': f'No hay suficientes licencias disponibles para {game.name}'}), 400
-        
-        subtotal += game.price * item['quantity']
+    try:
+        quote = price_cart(items)
+    except CartError as e:
+        return jsonify({'error': e.message}), e.status
     
-    # Calcular descuento
-    discount_percentage = calculate_discount(items)
-    discount_amount = (subtotal * discount_percentage) / 100
-    total = subtotal - discount_amount
+    total = quote['total']
     
     # Crear transacción
+    now = datetime.utcnow()
     transaction = Transaction(
         user_id=user_id,
-        date=datetime.utcnow(),
+        date=now,
         total_amount=total,
-        discount_percentage=discount_percentage,
+        discount_percentage=quote['discount_percentage'],
         transaction_type='purchase'
     )
     
     try:
+        # Reservar stock de forma atómica antes de registrar la compra
+        reserve_stock(quote)
+        
         db.session.add(transaction)
         db.session.flush()  # Para obtener el ID de la transacción
         
-        # Crear detalles de transacción y actualizar inventario
-        for item in items:
-            game = Game.query.get(item['game_id'])
-            
-            # Crear detalle
-            detail = TransactionDetail(
-                transaction_id=transaction.id,
-                game_id=game.id,
-                quantity=item['quantity'],
-                unit_price=game.price
-            )
-            db.session.add(detail)
-            
-            # Actualizar inventario
-            game.available_licenses -= item['quantity']
-            game.sold_licenses += item['quantity']
+        # Crear detalles de transacción en un solo executemany
+        db.session.execute(TransactionDetail.__table__.insert(), [{
+            'transaction_id': transaction.id,
+            'game_id': game.id,
+            'quantity': quantity,
+            'unit_price': game.price
+        } for game, quantity in quote['lines']])
+        
+        # Actualizar el resumen diario de ventas en la misma transacción
+        record_sales(quote['lines'], quote['discount_percentage'], now.date())
         
+        bump_catalog_version()
         db.session.commit()
         
         return jsonify({
@@ -122,37 +88,169 @@ def checkout():
             'total': total
         }), 200
         
+    except CartError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Error al procesar la compra'}), 500
 
+@cart.route('/cart/checkout/batch', methods=['POST'])
+@jwt_required()
+def checkout_batch():
+    """
+    Checkout de muchos carritos independientes en un solo request y un solo commit.
+    Cada carrito se aprueba o rechaza por separado: uno sin stock no afecta a los demás.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    carts = data.get('carts')
+    
+    if not isinstance(carts, list) or not carts:
+        return jsonify({'error': 'Debe enviar al menos un carrito'}), 400
+    max_carts = current_app.config.get('BATCH_CHECKOUT_MAX_CARTS', 500)
+    if len(carts) > max_carts:
+        return jsonify({'error': f'Máximo {max_carts} carritos por lote'}), 400
+    
+    results = [None] * len(carts)
+    accepted = []
+    try:
+        # Una sola consulta para todos los juegos del lote
+        games_by_id = load_games(
+            item.get('game_id') for cart_data in carts if isinstance(cart_data, dict)
+            for item in cart_data.get('items') or [] if isinstance(item, dict)
+            and isinstance(item.get('game_id'), int)
+        )
+        # Stock que queda según lo reservado en este lote; evita UPDATE que fallarían
+        remaining = {game_id: game.available_licenses for game_id, game in games_by_id.items()}
+        
+        for index, cart_data in enumerate(carts):
+            items = cart_data.get('items') if isinstance(cart_data, dict) else None
+            try:
+                if not items:
+                    raise CartError('El carrito está vacío')
+                try:
+                    quote = price_cart(items, games_by_id)
+                except (KeyError, TypeError, AttributeError):
+                    raise CartError('Carrito inválido')
+                for game_id, quantity in quote['quantities'].items():
+                    if quantity > remaining[game_id]:
+                        raise CartError(f'No hay suficientes licencias disponibles para {games_by_id[game_id].name}')
+                reserve_stock(quote)
+            except CartError as e:
+                results[index] = {'index': index, 'success': False, 'error': e.message, 'status': e.status}
+                continue
+            for game_id, quantity in quote['quantities'].items():
+                remaining[game_id] -= quantity
+            accepted.append((index, quote))
+        
+        # Registrar todas las compras aprobadas
+        now = datetime.utcnow()
+        transactions = [Transaction(
+            user_id=user_id,
+            date=now,
+            total_amount=quote['total'],
+            discount_percentage=quote['discount_percentage'],
+            transaction_type='purchase'
+        ) for _, quote in accepted]
+        db.session.add_all(transactions)
+        # Para obtener los IDs; en SQLite el ORM emite un INSERT por transacción
+        with allow_repeated_queries():
+            db.session.flush()
+        
+        details = []
+        lines_by_discount = {}
+        for transaction, (index, quote) in zip(transactions, accepted):
+            for game, quantity in quote['lines']:
+                details.append({
+                    'transaction_id': transaction.id,
+                    'game_id': game.id,
+                    'quantity': quantity,
+                    'unit_price': game.price
+                })
+            lines_by_discount.setdefault(quote['discount_percentage'], []).extend(quote['lines'])
+            results[index] = {
+                'index': index,
+                'success': True,
+                'transaction_id': transaction.id,
+                'total': quote['total']
+            }
+        if details:
+            db.session.execute(TransactionDetail.__table__.insert(), details)
+        
+        # Un upsert del resumen diario por cada porcentaje de descuento del lote
+        for discount_percentage, lines in lines_by_discount.items():
+            record_sales(lines, discount_percentage, now.date())
+        
+        if accepted:
+            bump_catalog_version()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Error al procesar las compras'}), 500
+    
+    return jsonify({
+        'succeeded': len(accepted),
+        'failed': len(carts) - len(accepted),
+        'results': results
+    }), 200
+
 @cart.route('/transactions', methods=['GET'])
 @jwt_required()
 def get_transactions():
     user_id = get_jwt_identity()
     
-    transactions = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.date.desc()).all()
+    # Parámetros de paginación por cursor (date, id)
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        cursor = decode_cursor(after) if after else None
+        if cursor:
+            cursor_date = datetime.fromisoformat(cursor[0])
+            cursor_id = int(cursor[1])
+    except (ValueError, IndexError, TypeError):
+        return jsonify({'error': 'Parámetros de paginación inválidos'}), 400
+    
+    query = Transaction.query.filter_by(user_id=user_id)
+    if cursor:
+        query = query.filter(or_(
+            Transaction.date < cursor_date,
+            and_(Transaction.date == cursor_date, Transaction.id < cursor_id)
+        ))
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
     
-    result = []
-    for transaction in transactions:
-        details = TransactionDetail.query.filter_by(transaction_id=transaction.id).all()
-        items = []
-        for detail in details:
-            game = Game.query.get(detail.game_id)
-            items.append({
-                'game_name': game.name,
+    # La página y sus detalles se leen con dos consultas
+    transactions, has_more = fetch_page(query, limit)
+    headers = {}
+    if has_more:
+        last = transactions[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([last.date.isoformat(), last.id])
+    
+    return jsonify(_transactions_with_items(transactions)), 200, headers
+
+def _transactions_with_items(transactions):
+    # Carga los detalles de todas las transacciones de la página con el nombre del
+    # juego en una sola consulta
+    items_by_transaction = {t.id: [] for t in transactions}
+    if transactions:
+        details = db.session.query(TransactionDetail, Game.name)\
+            .join(Game, Game.id == TransactionDetail.game_id)\
+            .filter(TransactionDetail.transaction_id.in_(items_by_transaction.keys()))\
+            .order_by(TransactionDetail.id)\
+            .all()
+        for detail, game_name in details:
+            items_by_transaction[detail.transaction_id].append({
+                'game_name': game_name,
                 'quantity': detail.quantity,
                 'unit_price': detail.unit_price,
                 'subtotal': detail.quantity * detail.unit_price
             })
-        
-        result.append({
-            'id': transaction.id,
-            'date': transaction.date.isoformat(),
-            'total_amount': transaction.total_amount,
-            'discount_percentage': transaction.discount_percentage,
-            'transaction_type': transaction.transaction_type,
-            'items': items
-        })
-    
-    return jsonify(result), 200 
\ No newline at end of file
+    
+    return [{
+        'id': transaction.id,
+        'date': transaction.date.isoformat(),
+        'total_amount': transaction.total_amount,
+        'discount_percentage': transaction.discount_percentage,
+        'transaction_type': transaction.transaction_type,
+        'items': items_by_transaction[transaction.id]
+    } for transaction in transactions]
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, current_app
+from app import db, CatalogVersion
+
+DEFAULT_CACHE_SIZE = 512
+# Tope de vida de una entrada, para cambios hechos fuera de la aplicación
+DEFAULT_CACHE_TTL = 60
+
+
+def catalog_version():
+    """
+    Versión actual del catálogo; cambia cada vez que se modifica un juego o el stock.
+    Se guarda en la tabla catalog_version, así todos los workers y procesos ven la misma.
+    """
+    return db.session.query(CatalogVersion.version).filter(CatalogVersion.id == 1).scalar() or 0
+
+
+def bump_catalog_version():
+    """
+    Invalida las respuestas cacheadas del catálogo en todos los procesos. Llamar dentro
+    de la transacción que modifica el catálogo, justo antes del commit: el cambio y la
+    versión nueva se confirman juntos.
+    """
+    updated = CatalogVersion.query.filter(CatalogVersion.id == 1)\
+        .update({CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False)
+    if not updated:
+        db.session.add(CatalogVersion(id=1, version=1))
+
+
+class LRUCache:
+    """Caché LRU acotada en número de entradas y en tiempo de vida, segura entre hilos."""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = LRUCache(current_app.config.get('CATALOG_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+                          current_app.config.get('CATALOG_CACHE_TTL', DEFAULT_CACHE_TTL))
+    return _cache
+
+
+def _request_key():
+    return (request.path, tuple(sorted(request.args.items(multi=True))))
+
+
+def _make_etag(version, key):
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+    return f'{version}-{digest}'
+
+
+def cached_catalog_response(view):
+    """
+    Cachea las respuestas 200 de una vista del catálogo por (versión, ruta, parámetros)
+    y responde 304 Not Modified si el ETag del cliente sigue vigente. Solo se consulta
+    la versión (una lectura por clave primaria); el ETag es el mismo en todos los workers.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = catalog_version()
+        key = _request_key()
+        etag = _make_etag(version, key)
+
+        # If-None-Match usa comparación débil (RFC 9110)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            cache = get_cache()
+            cached = cache.get((version, key))
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                headers = [(k, v) for k, v in response.headers if k != 'Content-Length']
+                cached = (response.get_data(), headers)
+                cache.put((version, key), cached)
+            if cached is not None:
+                response = current_app.response_class(cached[0], status=200, headers=cached[1])
+
+        # Débil: el mismo ETag cubre el cuerpo sin comprimir y el gzip, que son
+        # representaciones distintas
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
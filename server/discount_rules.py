@@ -0,0 +1,136 @@
+"""
+Reglas de descuento por volumen compartidas por el servidor y la CLI (public/).
+
+Las reglas se definen en un archivo JSON (DISCOUNT_RULES_PATH, por defecto
+discount_rules.json junto a este módulo). Cada regla pide un mínimo de licencias
+por categoría y se evalúan en orden de prioridad; gana la primera que se cumple.
+Los nombres de categoría se normalizan sin tildes ni mayúsculas, y ``aliases``
+unifica variantes ('deporte' -> 'deportes'), de modo que el catálogo del
+servidor y el JSON de la CLI comparten la misma definición.
+
+El archivo se compila una vez a tuplas y se vuelve a leer sin reiniciar cuando
+cambia su fecha de modificación (revisada como mucho cada
+DISCOUNT_RULES_CHECK_SECONDS). Si la versión nueva no es válida se conservan
+las reglas anteriores.
+
+Este módulo solo usa la biblioteca estándar para que la CLI pueda importarlo.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'discount_rules.json')
+
+logger = logging.getLogger(__name__)
+
+
+def _strip(name):
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class CompiledRules:
+    """Reglas ya validadas: tuplas (porcentaje, ((categoría, mínimo), ...)) en orden de prioridad."""
+
+    def __init__(self, data):
+        self.aliases = {_strip(k): _strip(v) for k, v in data.get('aliases', {}).items()}
+        rules = sorted(data['rules'], key=lambda rule: rule.get('priority', 0))
+        compiled = []
+        for rule in rules:
+            percentage = rule['percentage']
+            if not isinstance(percentage, (int, float)) or not 0 <= percentage <= 100:
+                raise ValueError(f'Porcentaje inválido en la regla {rule.get("name")!r}')
+            conditions = tuple((self.canonical(category), int(minimum))
+                               for category, minimum in rule['min_licenses'].items())
+            if not conditions:
+                raise ValueError(f'La regla {rule.get("name")!r} no tiene condiciones')
+            compiled.append((percentage, conditions))
+        self.rules = tuple(compiled)
+        self.categories = frozenset(c for _, conditions in self.rules for c, _ in conditions)
+        self._canonical = {}
+
+    def canonical(self, category):
+        """Nombre normalizado de una categoría, aplicando los alias."""
+        name = _strip(category)
+        return self.aliases.get(name, name)
+
+    def totals(self, category_licenses):
+        """Suma las licencias por categoría normalizada; solo conserva las que usan las reglas."""
+        totals = {}
+        cache = self._canonical
+        for category, quantity in category_licenses.items():
+            name = cache.get(category)
+            if name is None:
+                name = cache[category] = self.canonical(category)
+            if name in self.categories:
+                totals[name] = totals.get(name, 0) + quantity
+        return totals
+
+    def discount(self, category_licenses):
+        """Porcentaje de la primera regla que se cumple (0 si ninguna)."""
+        totals = self.totals(category_licenses)
+        for percentage, conditions in self.rules:
+            if all(totals.get(category, 0) >= minimum for category, minimum in conditions):
+                return percentage
+        return 0
+
+
+class DiscountRules:
+    """Reglas compiladas del archivo ``path``, recargadas cuando el archivo cambia."""
+
+    def __init__(self, path=None, check_seconds=None):
+        self.path = path or os.environ.get('DISCOUNT_RULES_PATH', DEFAULT_PATH)
+        if check_seconds is None:
+            check_seconds = float(os.environ.get('DISCOUNT_RULES_CHECK_SECONDS', 1))
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    def _load(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                compiled = CompiledRules(json.load(f))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            if self._compiled is None:
+                raise
+            logger.warning('Reglas de descuento inválidas en %s, se mantienen las anteriores: %s', self.path, e)
+        else:
+            self._compiled = compiled
+        self._signature = signature
+
+    def current(self):
+        """Reglas compiladas vigentes; revisa el archivo si pasó el intervalo de comprobación."""
+        now = time.monotonic()
+        if self._compiled is None or now - self._checked_at >= self.check_seconds:
+            with self._lock:
+                if self._compiled is None or now - self._checked_at >= self.check_seconds:
+                    try:
+                        self._load()
+                    except OSError as e:
+                        if self._compiled is None:
+                            raise
+                        logger.warning('No se pudo leer %s, se mantienen las reglas anteriores: %s', self.path, e)
+                    self._checked_at = now
+        return self._compiled
+
+    def reload(self):
+        """Fuerza la lectura del archivo en la próxima consulta."""
+        with self._lock:
+            self._signature = None
+            self._checked_at = 0.0
+
+    def discount(self, category_licenses):
+        """Porcentaje de descuento (0-100) para las licencias sumadas por categoría."""
+        return self.current().discount(category_licenses)
+
+
+discount_rules = DiscountRules()
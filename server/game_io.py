@@ -0,0 +1,194 @@
+"""
+Importación y exportación masiva del catálogo en NDJSON o CSV.
+
+La importación lee el cuerpo del request línea por línea, valida cada fila al
+llegar y acumula las válidas en lotes que se insertan con executemany. Los
+nombres existentes se cargan una sola vez en un set, de modo que la unicidad se
+comprueba en memoria (también entre filas del mismo archivo). Todo ocurre en una
+transacción; el llamador hace commit. Los triggers del índice FTS se encargan de
+mantener la búsqueda sincronizada.
+"""
+import csv
+import io
+import json
+import math
+from app import db, Game
+
+DEFAULT_CHUNK_SIZE = 1000
+# Filas con error que se devuelven en el reporte; el resto solo se cuenta
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+CSV_TYPES = ('text/csv', 'application/csv')
+
+# Columnas que se exportan y se aceptan al importar ('id' se ignora al importar)
+EXPORT_COLUMNS = ['id', 'name', 'category', 'size_kb', 'price', 'available_licenses',
+                  'sold_licenses', 'image_url', 'min_stock']
+# Caracteres con los que una planilla interpreta una celda CSV como fórmula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class RowError(ValueError):
+    """Fila inválida del archivo importado."""
+
+
+def detect_format(mimetype, requested=None):
+    """Devuelve 'ndjson' o 'csv' según ``?format=`` o el Content-Type; None si no se reconoce."""
+    if requested in ('ndjson', 'csv'):
+        return requested
+    if mimetype in NDJSON_TYPES:
+        return 'ndjson'
+    if mimetype in CSV_TYPES:
+        return 'csv'
+    return None
+
+
+def iter_rows(stream, fmt):
+    """Genera (número de fila, dict) leyendo ``stream`` (bytes) línea por línea."""
+    lines = (line.decode('utf-8-sig' if i == 0 else 'utf-8') for i, line in enumerate(stream))
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for number, row in enumerate(reader, start=1):
+            yield number, row
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, RowError('JSON inválido')
+            continue
+        yield number, row if isinstance(row, dict) else RowError('Cada línea debe ser un objeto JSON')
+
+
+def text_field(row, field, max_length, required=True):
+    """Texto de ``row[field]`` sin espacios alrededor, validado contra ``max_length``; lanza RowError."""
+    value = row.get(field)
+    if value is None or value == '':
+        if required:
+            raise RowError(f'Falta {field}')
+        return ''
+    if not isinstance(value, str):
+        raise RowError(f'{field} debe ser texto')
+    value = value.strip()
+    if required and not value:
+        raise RowError(f'Falta {field}')
+    if len(value) > max_length:
+        raise RowError(f'{field} supera {max_length} caracteres')
+    return value
+
+
+def _integer(row, field, default=None):
+    value = row.get(field)
+    if value is None or value == '':
+        if default is None:
+            raise RowError(f'Falta {field}')
+        return default
+    if isinstance(value, bool):
+        raise RowError(f'{field} debe ser un entero')
+    try:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field} debe ser un entero')
+    if value < 0:
+        raise RowError(f'{field} no puede ser negativo')
+    return value
+
+
+def _price(row):
+    value = row.get('price')
+    if value is None or value == '' or isinstance(value, bool):
+        raise RowError('Falta price')
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise RowError('price debe ser un número')
+    if not math.isfinite(value) or value < 0:
+        raise RowError('price debe ser un número no negativo')
+    return value
+
+
+def validate_row(row):
+    """Convierte una fila del archivo en los valores de una fila de ``game``; lanza RowError."""
+    return {
+        'name': text_field(row, 'name', 100),
+        'category': text_field(row, 'category', 50),
+        'size_kb': _integer(row, 'size_kb'),
+        'price': _price(row),
+        'available_licenses': _integer(row, 'available_licenses'),
+        'sold_licenses': _integer(row, 'sold_licenses', 0),
+        'image_url': text_field(row, 'image_url', 200, required=False),
+        'min_stock': _integer(row, 'min_stock', 5)
+    }
+
+
+def import_games(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Valida e inserta las filas de ``iter_rows`` en la sesión actual, sin hacer commit.
+    Devuelve (insertados, errores, total de errores); ``errores`` es
+    [{'row': n, 'error': str}] con a lo sumo MAX_REPORTED_ERRORS elementos.
+    """
+    names = {name for (name,) in db.session.query(Game.name)}
+    insert = Game.__table__.insert()
+    inserted = 0
+    errors = []
+    error_count = 0
+    batch = []
+    for number, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            values = validate_row(row)
+            if values['name'] in names:
+                raise RowError('Ya existe un juego con ese nombre')
+        except RowError as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': number, 'error': str(e)})
+            continue
+        names.add(values['name'])
+        batch.append(values)
+        if len(batch) >= chunk_size:
+            db.session.execute(insert, batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert, batch)
+        inserted += len(batch)
+    return inserted, errors, error_count
+
+
+def _csv_cell(value):
+    """Valor para una celda CSV: los textos que empiezan como fórmula se anteponen con ``'``."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(fmt, batch_size=DEFAULT_CHUNK_SIZE):
+    """Genera el catálogo completo en ``fmt`` por fragmentos, leyendo las filas de a lotes."""
+    columns = [getattr(Game, c) for c in EXPORT_COLUMNS]
+    query = db.session.query(*columns).order_by(Game.id).yield_per(batch_size)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for i, row in enumerate(query, start=1):
+            writer.writerow([_csv_cell(value) for value in row])
+            if i % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+    chunk = []
+    for row in query:
+        chunk.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+        if len(chunk) >= batch_size:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
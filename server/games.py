@@ -1,45 +1,104 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from sqlalchemy import or_
-from app import db, Game, User
+from flask import Blueprint, Response, request, jsonify, stream_with_context, current_app
+from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
+from app import db, Game
+from authz import admin_required
+from catalog_cache import cached_catalog_response, bump_catalog_version
+from search import search_enabled, search_matches
+from pagination import parse_limit, fetch_page, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from game_io import detect_format, iter_rows, import_games, export_rows, DEFAULT_CHUNK_SIZE
 
 games = Blueprint('games', __name__)
 
+# Columnas que se pueden pedir con ?fields= y las que devuelve el listado por defecto
+GAME_FIELDS = {
+    'id': Game.id,
+    'name': Game.name,
+    'category': Game.category,
+    'size_kb': Game.size_kb,
+    'price': Game.price,
+    'available_licenses': Game.available_licenses,
+    'sold_licenses': Game.sold_licenses,
+    'image_url': Game.image_url,
+    'min_stock': Game.min_stock
+}
+LIST_FIELDS = ['id', 'name', 'category', 'price', 'available_licenses', 'image_url']
+
 @games.route('/games', methods=['GET'])
+@cached_catalog_response
 def get_games():
     # Obtener parámetros de filtrado y ordenamiento
     search = request.args.get('search', '')
     category = request.args.get('category', '')
     sort_by = request.args.get('sort_by', 'name')
-    sort_order = request.args.get('sort_order', 'asc')
+    if sort_by not in ('price', 'relevance'):
+        sort_by = 'name'
+    sort_order = 'desc' if request.args.get('sort_order', 'asc') == 'desc' else 'asc'
+    
+    # Búsqueda por el índice FTS5; si no está disponible se usa ILIKE
+    matches = search_matches(search) if search and search_enabled() else None
+    if sort_by == 'relevance' and matches is None:
+        sort_by = 'name'
+    
+    # Parámetros de paginación y proyección
+    fields = request.args.get('fields', '')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else LIST_FIELDS
+    if any(f not in GAME_FIELDS for f in fields):
+        return jsonify({'error': 'Campos inválidos'}), 400
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        cursor = decode_cursor(after) if after else None
+        if cursor:
+            if len(cursor) != 4 or cursor[:2] != [sort_by, sort_order]:
+                raise ValueError('El cursor no corresponde al ordenamiento')
+            last_value, last_id = cursor[2], int(cursor[3])
+    except (ValueError, IndexError, TypeError):
+        return jsonify({'error': 'Parámetros de paginación inválidos'}), 400
     
-    # Construir query base
-    query = Game.query
+    # Solo se seleccionan las columnas pedidas, más las necesarias para el cursor
+    columns = [GAME_FIELDS[c] for c in dict.fromkeys(fields + ['id'])]
+    if sort_by == 'relevance':
+        sort_column = matches.c.rank
+        columns.append(sort_column.label('relevance'))
+    else:
+        sort_column = GAME_FIELDS[sort_by]
+        columns.append(sort_column.label('sort_value'))
+    query = db.session.query(*columns)
     
     # Aplicar filtros
-    if search:
+    if matches is not None:
+        query = query.join(matches, matches.c.game_id == Game.id)
+    elif search:
         query = query.filter(Game.name.ilike(f'%{search}%'))
     if category:
         query = query.filter(Game.category == category)
     
+    # Continuar después de la última fila de la página anterior (desempate por id)
+    if cursor:
+        if sort_order == 'asc':
+            query = query.filter(or_(sort_column > last_value,
+                                     and_(sort_column == last_value, Game.id > last_id)))
+        else:
+            query = query.filter(or_(sort_column < last_value,
+                                     and_(sort_column == last_value, Game.id < last_id)))
+    
     # Aplicar ordenamiento
-    if sort_by == 'price':
-        query = query.order_by(Game.price.asc() if sort_order == 'asc' else Game.price.desc())
-    else:  # Por defecto ordenar por nombre
-        query = query.order_by(Game.name.asc() if sort_order == 'asc' else Game.name.desc())
-    
-    # Ejecutar query y formatear resultados
-    games_list = query.all()
-    return jsonify([{
-        'id': game.id,
-        'name': game.name,
-        'category': game.category,
-        'price': game.price,
-        'available_licenses': game.available_licenses,
-        'image_url': game.image_url
-    } for game in games_list]), 200
+    if sort_order == 'asc':
+        query = query.order_by(sort_column.asc(), Game.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), Game.id.desc())
+    
+    # La página tiene a lo sumo MAX_LIMIT filas: se lee completa y el cursor sale de la última
+    rows, has_more = fetch_page(query, limit)
+    headers = {}
+    if has_more:
+        # La columna de ordenamiento es la última seleccionada
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([sort_by, sort_order, rows[-1][-1], rows[-1].id])
+    return jsonify([{field: getattr(row, field) for field in fields} for row in rows]), 200, headers
 
 @games.route('/games/<int:game_id>', methods=['GET'])
+@cached_catalog_response
 def get_game_details(game_id):
     game = Game.query.get_or_404(game_id)
     return jsonify({
@@ -54,13 +113,8 @@ def get_game_details(game_id):
     }), 200
 
 @games.route('/games', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_game():
-    # Verificar si el usuario es administrador
-    claims = get_jwt()
-    if not claims.get('is_admin', False):
-        return jsonify({'error': 'No autorizado'}), 403
-    
     data = request.get_json()
     
     # Validar datos requeridos
@@ -84,6 +138,7 @@ def create_game():
     
     try:
         db.session.add(new_game)
+        bump_catalog_version()
         db.session.commit()
         return jsonify({'message': 'Juego creado exitosamente', 'id': new_game.id}), 201
     except Exception as e:
@@ -91,14 +146,8 @@ def create_game():
         return jsonify({'error': 'Error al crear el juego'}), 500
 
 @games.route('/games/<int:game_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_game(game_id):
-    # Verificar si el usuario es administrador
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        return jsonify({'error': 'No autorizado'}), 403
-    
     game = Game.query.get_or_404(game_id)
     data = request.get_json()
     
@@ -117,8 +166,52 @@ def update_game(game_id):
         game.min_stock = data['min_stock']
     
     try:
+        bump_catalog_version()
         db.session.commit()
         return jsonify({'message': 'Juego actualizado exitosamente'}), 200
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Error al actualizar el juego'}), 500 
\ No newline at end of file
+        return jsonify({'error': 'Error al actualizar el juego'}), 500 
+
+@games.route('/games/bulk', methods=['POST'])
+@admin_required
+def bulk_import_games():
+    # El cuerpo se lee como stream: NDJSON (un juego por línea) o CSV con encabezado
+    fmt = detect_format(request.mimetype, request.args.get('format'))
+    if fmt is None:
+        return jsonify({'error': 'Formato no soportado, use NDJSON o CSV'}), 415
+    
+    chunk_size = current_app.config.get('BULK_IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    try:
+        inserted, errors, error_count = import_games(iter_rows(request.stream, fmt), chunk_size)
+        if inserted:
+            bump_catalog_version()
+        db.session.commit()
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'El archivo debe estar codificado en UTF-8'}), 400
+    except IntegrityError:
+        # Otro request creó un juego con el mismo nombre durante la importación
+        db.session.rollback()
+        return jsonify({'error': 'Conflicto de nombres durante la importación, reintente'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Error al importar los juegos'}), 500
+    
+    return jsonify({
+        'inserted': inserted,
+        'error_count': error_count,
+        'errors': errors
+    }), 200
+
+@games.route('/games/export', methods=['GET'])
+@admin_required
+def export_games():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Formato no soportado, use ndjson o csv'}), 400
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(export_rows(fmt)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=games.{fmt}'
+    return response
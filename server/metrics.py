@@ -0,0 +1,148 @@
+"""
+Métricas por endpoint en formato de texto de Prometheus.
+
+Por cada request se mide el tiempo total, la cantidad de sentencias SQL y el
+tiempo pasado en la base (eventos before/after_cursor_execute del engine). Los
+valores se acumulan en histogramas en memoria del proceso, con buckets fijos:
+registrar una observación es una búsqueda binaria y un incremento bajo un lock.
+Con varios procesos (gunicorn) cada uno expone sus propias métricas.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import Blueprint, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+metrics = Blueprint('metrics', __name__)
+
+# Límites superiores de los buckets (el bucket +Inf es implícito)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Histograma con etiquetas endpoint y method, seguro entre hilos."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Conteos por bucket (no acumulados; el último es +Inf), suma y total
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for (endpoint, method), counts, total, count in snapshot:
+            label_text = f'endpoint="{_escape(endpoint)}",method="{method}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{_format(bound)}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {_format(total)}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+request_duration = Histogram('grs_request_duration_seconds',
+                             'Tiempo total de atención del request', DURATION_BUCKETS)
+request_db_duration = Histogram('grs_request_db_duration_seconds',
+                                'Tiempo del request ejecutando sentencias SQL', DURATION_BUCKETS)
+request_statements = Histogram('grs_request_sql_statements',
+                               'Sentencias SQL ejecutadas por request', STATEMENT_BUCKETS)
+HISTOGRAMS = (request_duration, request_db_duration, request_statements)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts or not has_request_context():
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if 'metrics_start' in g:
+        g.metrics_statements += 1
+        g.metrics_db_time += elapsed
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # Una sentencia que falla no llega a after_cursor_execute
+    connection = context.connection
+    starts = connection.info.get('metrics_query_start') if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_statements = 0
+    g.metrics_db_time = 0.0
+
+
+def _after_request(response):
+    # Los requests sin endpoint (404) y la propia consulta de métricas no se registran
+    endpoint = request.endpoint
+    if 'metrics_start' in g and endpoint and endpoint != 'metrics.get_metrics':
+        labels = (endpoint, request.method)
+        request_duration.observe(labels, time.perf_counter() - g.metrics_start)
+        request_db_duration.observe(labels, g.metrics_db_time)
+        request_statements.observe(labels, g.metrics_statements)
+    return response
+
+
+def init_metrics(app):
+    """Registra la medición de requests en ``app`` si METRICS_ENABLED está activo."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def render_metrics():
+    """Texto de todas las métricas en el formato de exposición de Prometheus."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+@metrics.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return Response('Métricas desactivadas\n', status=404, mimetype='text/plain')
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
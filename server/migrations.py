@@ -0,0 +1,137 @@
+"""
+Migraciones versionadas del esquema.
+
+``db.create_all()`` solo crea las tablas que faltan; los cambios sobre bases de datos
+existentes (índices nuevos, columnas, tablas virtuales) se registran aquí. La versión
+aplicada se guarda en la tabla ``schema_version`` y cada migración se ejecuta una sola vez.
+
+Se aplican al iniciar el servidor o con ``flask migrate``. Los índices y tablas se
+crean a partir de los modelos con ``checkfirst``, de modo que las migraciones
+funcionan igual en SQLite, PostgreSQL y MySQL; los pasos propios de SQLite (tabla
+antigua de transacciones, índice FTS5) se omiten en las demás bases.
+"""
+from sqlalchemy import func, inspect, select, text
+from app import db, CatalogVersion, GameSalesDaily, Transaction, TransactionDetail
+from search import create_search_index
+
+
+def _align_transaction_table(conn):
+    # Bases SQLite creadas con el modelo antiguo tienen 'total' en lugar de 'total_amount'
+    if conn.dialect.name != 'sqlite':
+        return
+    inspector = inspect(conn)
+    if not inspector.has_table('transaction'):
+        return
+    columns = [column['name'] for column in inspector.get_columns('transaction')]
+    if 'total' not in columns or 'total_amount' in columns:
+        return
+    conn.execute(text('''
+        CREATE TABLE transaction_new (
+            id INTEGER NOT NULL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES user (id),
+            date DATETIME NOT NULL,
+            total_amount FLOAT NOT NULL,
+            discount_percentage FLOAT,
+            transaction_type VARCHAR(20) NOT NULL
+        )
+    '''))
+    conn.execute(text('''
+        INSERT INTO transaction_new (id, user_id, date, total_amount, discount_percentage, transaction_type)
+        SELECT id, user_id, date, total, 0, 'purchase' FROM "transaction"
+    '''))
+    conn.execute(text('DROP TABLE "transaction"'))
+    conn.execute(text('ALTER TABLE transaction_new RENAME TO "transaction"'))
+
+
+def _create_search_index(conn):
+    if conn.dialect.name == 'sqlite':
+        create_search_index(conn)
+
+
+def _create_index(name):
+    """Paso que crea el índice ``name`` definido en los modelos, si todavía no existe."""
+    def step(conn):
+        index = next(index for table in db.metadata.tables.values()
+                     for index in table.indexes if index.name == name)
+        index.create(conn, checkfirst=True)
+    return step
+
+
+def _create_sales_summary(conn):
+    table = GameSalesDaily.__table__
+    table.create(conn, checkfirst=True)
+    _create_index('ix_game_sales_daily_day')(conn)
+    # Cargar el historial existente una sola vez
+    detail = TransactionDetail.__table__
+    transaction = Transaction.__table__
+    day = func.date(transaction.c.date)
+    history = select(
+        detail.c.game_id,
+        day,
+        func.sum(detail.c.quantity),
+        func.sum(detail.c.quantity * detail.c.unit_price
+                 * (1 - func.coalesce(transaction.c.discount_percentage, 0) / 100.0))
+    ).select_from(detail.join(transaction, transaction.c.id == detail.c.transaction_id))\
+        .where(transaction.c.transaction_type == 'purchase')\
+        .group_by(detail.c.game_id, day)
+    conn.execute(table.insert().from_select(['game_id', 'day', 'licenses', 'revenue'], history))
+
+
+
+def _create_catalog_version(conn):
+    table = CatalogVersion.__table__
+    table.create(conn, checkfirst=True)
+    if conn.execute(select(table.c.id).where(table.c.id == 1)).first() is None:
+        conn.execute(table.insert().values(id=1, version=0))
+
+
+# (versión, descripción, pasos): cada paso es una sentencia SQL o una función que recibe la conexión
+MIGRATIONS = [
+    (1, 'Alinear la tabla transaction con el modelo', [
+        _align_transaction_table,
+    ]),
+    (2, 'Índices de catálogo y transacciones', [
+        _create_index('ix_game_price'),
+        _create_index('ix_game_category_name'),
+        _create_index('ix_game_category_price'),
+        _create_index('ix_transaction_user_date'),
+        _create_index('ix_transaction_detail_transaction'),
+    ]),
+    (3, 'Índice de búsqueda FTS5 sobre game', [
+        _create_search_index,
+    ]),
+    (4, 'Resumen diario de ventas por juego', [
+        _create_sales_summary,
+    ]),
+    (5, 'Índice del directorio de usuarios por rol', [
+        _create_index('ix_user_is_admin_id'),
+    ]),
+    (6, 'Versión del catálogo compartida entre procesos', [
+        _create_catalog_version,
+    ]),
+]
+
+
+def current_version(conn):
+    conn.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+    return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+def run_migrations():
+    """Aplica en orden las migraciones pendientes y devuelve las versiones aplicadas."""
+    with db.engine.begin() as conn:
+        version = current_version(conn)
+
+    applied = []
+    for number, description, steps in MIGRATIONS:
+        if number <= version:
+            continue
+        with db.engine.begin() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            conn.execute(text('INSERT INTO schema_version (version) VALUES (:v)'), {'v': number})
+        applied.append((number, description))
+    return applied
@@ -3,6 +3,9 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 class User(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_is_admin_id', 'is_admin', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -18,6 +21,12 @@ class User(db.Model):
         }
 
 class Game(db.Model):
+    __table_args__ = (
+        db.Index('ix_game_price', 'price'),
+        db.Index('ix_game_category_name', 'category', 'name'),
+        db.Index('ix_game_category_price', 'category', 'price'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     category = db.Column(db.String(50), nullable=False)
@@ -29,6 +38,10 @@ class Game(db.Model):
     min_stock = db.Column(db.Integer, default=10)
 
 class Transaction(db.Model):
+    __table_args__ = (
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
@@ -37,8 +50,24 @@ class Transaction(db.Model):
     transaction_type = db.Column(db.String(20), nullable=False)  # 'purchase' o 'refund'
 
 class TransactionDetail(db.Model):
+    __table_args__ = (
+        db.Index('ix_transaction_detail_transaction', 'transaction_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=False)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float, nullable=False)
+
+class GameSalesDaily(db.Model):
+    # Resumen de ventas por juego y día; checkout lo actualiza en la misma transacción
+    __tablename__ = 'game_sales_daily'
+    __table_args__ = (
+        db.Index('ix_game_sales_daily_day', 'day'),
+    )
+
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    licenses = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
@@ -0,0 +1,45 @@
+import base64
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Cabecera donde se devuelve el cursor de la página siguiente
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Convierte el parámetro ``limit`` en un entero entre 1 y ``maximum``."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit debe ser positivo')
+    return min(limit, maximum)
+
+
+def fetch_page(query, limit):
+    """
+    Ejecuta ``query`` pidiendo una fila más que ``limit``. Devuelve (filas, hay_más):
+    la fila extra indica si existe una página siguiente sin una segunda consulta.
+    """
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def encode_cursor(values):
+    """Codifica la clave de la última fila de una página como cursor opaco."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodifica un cursor generado por ``encode_cursor``; lanza ValueError si es inválido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Cursor inválido')
+    if not isinstance(values, list):
+        raise ValueError('Cursor inválido')
+    return values
@@ -0,0 +1,113 @@
+"""
+Hash de contraseñas en un pool de procesos acotado.
+
+PBKDF2 es puro CPU: durante una avalancha de logins los hashes competirían por
+los núcleos con el resto de los requests. Las operaciones se envían a un pool
+de PASSWORD_HASH_WORKERS procesos, así que como mucho esa cantidad de hashes
+corre a la vez y los demás esperan en la cola del pool. El hilo del request
+sigue bloqueado hasta tener el resultado: el pool limita el CPU que usan los
+hashes, no libera al worker. Con 0 workers se ejecutan en el mismo hilo.
+``hash_passwords`` reparte una lista completa entre los procesos del pool, para
+el alta masiva de usuarios. Si un proceso del pool muere, el pool se recrea y
+se reintenta una vez; si vuelve a fallar, el hash se calcula en el hilo.
+
+El método y el costo se configuran con PASSWORD_HASH_METHOD en el formato de
+werkzeug, p. ej. 'pbkdf2:sha256:260000'.
+"""
+import threading
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 0)
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def _discard_executor(executor):
+    global _executor
+    with _executor_lock:
+        # Otro hilo puede haberlo reemplazado ya
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _in_pool(task, fallback):
+    # task(executor) en el pool; si el pool está roto se recrea una vez y después se usa fallback()
+    for _ in range(2):
+        executor = _get_executor()
+        if executor is None:
+            break
+        try:
+            return task(executor)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+    return fallback()
+
+
+def _run(fn, *args):
+    return _in_pool(lambda executor: executor.submit(fn, *args).result(), lambda: fn(*args))
+
+
+@lru_cache(maxsize=8)
+def _stored_method(method):
+    # werkzeug completa el método al guardarlo ('pbkdf2:sha256' -> 'pbkdf2:sha256:260000'):
+    # se toma el prefijo de un hash de prueba, calculado una vez por proceso
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+def needs_rehash(stored_hash, method):
+    """Indica si el hash guardado se generó con otro método o costo."""
+    return stored_hash.split('$', 1)[0] != _stored_method(method)
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify_and_rehash(stored_hash, password, method):
+    # Se ejecuta en el worker: verifica y, si corresponde, genera el hash nuevo en el mismo viaje
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if needs_rehash(stored_hash, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+def hash_password(password):
+    """Genera el hash de una contraseña con el método configurado."""
+    return _run(_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def hash_passwords(passwords):
+    """Genera los hashes de una lista de contraseñas en paralelo; conserva el orden."""
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    # Varios hashes por envío para no pagar un viaje al proceso por cada contraseña
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 0)
+    chunksize = max(1, len(passwords) // (max(workers, 1) * 4))
+    return _in_pool(
+        lambda executor: list(executor.map(_hash, passwords, repeat(method), chunksize=chunksize)),
+        lambda: [_hash(password, method) for password in passwords]
+    )
+
+
+def verify_password(stored_hash, password):
+    """
+    Verifica una contraseña. Devuelve (válida, hash_nuevo); hash_nuevo no es None cuando
+    el hash guardado usa un método o costo anterior y debe reemplazarse.
+    """
+    return _run(_verify_and_rehash, stored_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
@@ -0,0 +1,126 @@
+from app import Game
+from discount_rules import discount_rules
+from query_diagnostics import allow_repeated_queries
+
+
+class CartError(Exception):
+    """Error de validación del carrito con su código HTTP asociado."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def load_games(game_ids):
+    """Carga todos los juegos referenciados en una sola consulta IN (...)."""
+    ids = set(game_ids)
+    if not ids:
+        return {}
+    return {game.id: game for game in Game.query.filter(Game.id.in_(ids)).all()}
+
+
+def calculate_discount(category_licenses):
+    """Porcentaje de descuento a partir de las licencias sumadas por categoría (ver discount_rules.json)."""
+    return discount_rules.discount(category_licenses)
+
+
+def _positive_int(value):
+    # bool es subclase de int: True no es una cantidad válida
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+def validate_items(items):
+    """Lanza ``CartError`` (400) si algún ítem no tiene game_id y quantity enteros positivos."""
+    if not isinstance(items, list):
+        raise CartError('items debe ser una lista')
+    for item in items:
+        if not isinstance(item, dict) or not _positive_int(item.get('game_id')):
+            raise CartError('Cada ítem debe tener un game_id válido')
+        if not _positive_int(item.get('quantity')):
+            raise CartError('La cantidad debe ser un entero positivo')
+
+
+def price_cart(items, games_by_id=None):
+    """
+    Calcula subtotal, descuento y total de un carrito en una sola pasada.
+
+    Si no se recibe ``games_by_id`` se cargan los juegos con una única consulta.
+    Lanza ``CartError`` si un ítem es inválido, un juego no existe o no hay
+    licencias suficientes.
+    """
+    validate_items(items)
+    if games_by_id is None:
+        games_by_id = load_games(item['game_id'] for item in items)
+
+    subtotal = 0
+    category_licenses = {}
+    requested = {}
+    lines = []
+    for item in items:
+        game = games_by_id.get(item['game_id'])
+        if not game:
+            raise CartError(f'Juego no encontrado: {item["game_id"]}', 404)
+
+        quantity = item['quantity']
+        requested[game.id] = requested.get(game.id, 0) + quantity
+        if requested[game.id] > game.available_licenses:
+            raise CartError(f'No hay suficientes licencias disponibles para {game.name}')
+
+        subtotal += game.price * quantity
+        category_licenses[game.category] = category_licenses.get(game.category, 0) + quantity
+        lines.append((game, quantity))
+
+    discount_percentage = calculate_discount(category_licenses)
+    discount_amount = (subtotal * discount_percentage) / 100
+
+    return {
+        'subtotal': subtotal,
+        'discount_percentage': discount_percentage,
+        'discount_amount': discount_amount,
+        'total': subtotal - discount_amount,
+        'lines': lines,
+        'quantities': requested,
+        'category_licenses': category_licenses
+    }
+
+
+def reserve_stock(quote):
+    """
+    Descuenta el stock de un carrito calculado por ``price_cart`` con UPDATE
+    condicionales atómicos, sin leer y reescribir el valor en Python.
+
+    Cada juego se actualiza solo si aún tiene licencias suficientes. Si alguna fila no
+    se actualiza se devuelven las licencias ya descontadas de este carrito y se lanza
+    ``CartError``, de modo que el resto de la transacción no queda afectado (el checkout
+    por lotes sigue con los demás carritos). Los ids se recorren ordenados para que
+    transacciones concurrentes bloqueen filas en el mismo orden.
+    """
+    names = {game.id: game.name for game, _ in quote['lines']}
+    quantities = quote['quantities']
+    reserved = []
+    # Un UPDATE por juego distinto del carrito: la condición de stock es por fila
+    with allow_repeated_queries():
+        for game_id in sorted(quantities):
+            quantity = quantities[game_id]
+            updated = Game.query.filter(
+                Game.id == game_id,
+                Game.available_licenses >= quantity
+            ).update({
+                Game.available_licenses: Game.available_licenses - quantity,
+                Game.sold_licenses: Game.sold_licenses + quantity
+            }, synchronize_session=False)
+            if updated != 1:
+                _release_stock(reserved, quantities)
+                raise CartError(f'No hay suficientes licencias disponibles para {names[game_id]}')
+            reserved.append(game_id)
+
+
+def _release_stock(game_ids, quantities):
+    # Las filas siguen bloqueadas por esta transacción, así que revertir es seguro
+    for game_id in game_ids:
+        quantity = quantities[game_id]
+        Game.query.filter(Game.id == game_id).update({
+            Game.available_licenses: Game.available_licenses + quantity,
+            Game.sold_licenses: Game.sold_licenses - quantity
+        }, synchronize_session=False)
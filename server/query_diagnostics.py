@@ -0,0 +1,144 @@
+"""
+Diagnóstico de consultas para desarrollo y despliegues canary (opcional).
+
+Con QUERY_DIAGNOSTICS=log se agrupan las sentencias SQL de cada request por
+plantilla (el texto con los parámetros normalizados). Cuando una plantilla se
+repite más de QUERY_REPEAT_THRESHOLD veces en el mismo request, lo que suele
+indicar un N+1, se registra un warning con el endpoint y un extracto del stack
+del código que la ejecutó. Con QUERY_DIAGNOSTICS=strict además el request
+responde 500, pensado para pruebas y benchmarks.
+
+En ambos modos las sentencias que tardan más de SLOW_QUERY_MS se escriben en un
+log rotativo (SLOW_QUERY_LOG).
+"""
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODES = ('off', 'log', 'strict')
+
+logger = logging.getLogger('grs.query_diagnostics')
+slow_logger = logging.getLogger('grs.slow_queries')
+
+_THIS_FILE = os.path.abspath(__file__)
+_SERVER_DIR = os.path.dirname(_THIS_FILE)
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(\?|%\(\w+\)s|%s|:\w+)(\s*,\s*(\?|%\(\w+\)s|%s|:\w+))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+_config = {}
+
+
+def statement_template(statement):
+    """Texto de la sentencia con las listas IN (?, ?, ...) colapsadas y espacios normalizados."""
+    return _PLACEHOLDER_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+@contextmanager
+def allow_repeated_queries():
+    """
+    Excluye del detector las sentencias ejecutadas dentro del bloque, para bucles
+    donde repetir la sentencia es intencional (p. ej. un UPDATE condicional por juego).
+    """
+    if not has_request_context():
+        yield
+        return
+    g.diagnostics_allowed = g.get('diagnostics_allowed', 0) + 1
+    try:
+        yield
+    finally:
+        g.diagnostics_allowed -= 1
+
+
+def _stack_excerpt(limit=6):
+    # Solo los frames del código del servidor, sin este módulo
+    stack = [frame for frame in traceback.extract_stack() if frame.filename != _THIS_FILE]
+    frames = [frame for frame in stack if frame.filename.startswith(_SERVER_DIR)] or stack
+    return ''.join(traceback.format_list(frames[-limit:]))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('diagnostics_query_start', []).append(time.perf_counter())
+    # executemany ya es una operación por lotes: no cuenta como repetición
+    if (executemany or not has_request_context() or 'diagnostics_templates' not in g
+            or g.get('diagnostics_allowed', 0)):
+        return
+    template = statement_template(statement)
+    counts = g.diagnostics_templates
+    counts[template] = counts.get(template, 0) + 1
+    if counts[template] == _config['threshold'] + 1:
+        endpoint = request.endpoint or request.path
+        excerpt = _stack_excerpt()
+        logger.warning('Posible N+1 en %s: la sentencia se repitió más de %d veces\n%s\n%s',
+                       endpoint, _config['threshold'], template, excerpt)
+        g.diagnostics_findings.append({'endpoint': endpoint, 'statement': template})
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('diagnostics_query_start')
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if elapsed_ms >= _config['slow_ms']:
+        endpoint = (request.endpoint or request.path) if has_request_context() else '-'
+        slow_logger.info('%.1f ms %s %s params=%.200r', elapsed_ms, endpoint,
+                         _WHITESPACE.sub(' ', statement).strip(), parameters)
+
+
+def _handle_error(context):
+    connection = context.connection
+    starts = connection.info.get('diagnostics_query_start') if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _before_request():
+    g.diagnostics_templates = {}
+    g.diagnostics_findings = []
+
+
+def _after_request(response):
+    findings = g.get('diagnostics_findings')
+    if findings and _config['mode'] == 'strict':
+        response = jsonify({'error': 'Consultas repetidas detectadas (N+1)', 'findings': findings})
+        response.status_code = 500
+    return response
+
+
+def init_query_diagnostics(app):
+    """Activa el diagnóstico en ``app`` según QUERY_DIAGNOSTICS ('off', 'log' o 'strict')."""
+    mode = app.config.get('QUERY_DIAGNOSTICS', 'off')
+    if mode not in MODES:
+        raise ValueError(f'QUERY_DIAGNOSTICS debe ser uno de {MODES}')
+    if mode == 'off':
+        return
+    _config.update(
+        mode=mode,
+        threshold=app.config.get('QUERY_REPEAT_THRESHOLD', 5),
+        slow_ms=app.config.get('SLOW_QUERY_MS', 100)
+    )
+
+    if not slow_logger.handlers:
+        handler = RotatingFileHandler(
+            app.config.get('SLOW_QUERY_LOG', 'slow_queries.log'),
+            maxBytes=app.config.get('SLOW_QUERY_LOG_BYTES', 10 * 1024 * 1024),
+            backupCount=app.config.get('SLOW_QUERY_LOG_BACKUPS', 5),
+            encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_logger.addHandler(handler)
+        slow_logger.setLevel(logging.INFO)
+        slow_logger.propagate = False
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
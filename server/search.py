@@ -0,0 +1,81 @@
+import re
+from sqlalchemy import select, literal_column, text
+from sqlalchemy.sql import table, column
+from app import db
+
+# Índice FTS5 de contenido externo sobre game(name, category). Los triggers lo
+# mantienen sincronizado con cualquier INSERT/UPDATE/DELETE sobre game, incluidos
+# los de create_game y update_game.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS game_fts USING fts5(
+        name, category,
+        content='game', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS game_fts_ai AFTER INSERT ON game BEGIN
+        INSERT INTO game_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS game_fts_ad AFTER DELETE ON game BEGIN
+        INSERT INTO game_fts(game_fts, rowid, name, category) VALUES ('delete', old.id, old.name, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS game_fts_au AFTER UPDATE OF name, category ON game BEGIN
+        INSERT INTO game_fts(game_fts, rowid, name, category) VALUES ('delete', old.id, old.name, old.category);
+        INSERT INTO game_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END""",
+]
+
+game_fts = table('game_fts', column('rowid'), column('rank'))
+
+_fts_enabled = None
+
+
+def create_search_index(conn):
+    """Crea el índice FTS5 y sus triggers en ``conn`` si no existen, y lo llena con el catálogo actual."""
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_fts'"
+    )).first()
+    for statement in FTS_SCHEMA:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text("INSERT INTO game_fts(game_fts) VALUES ('rebuild')"))
+
+
+def ensure_search_index():
+    """Crea el índice de búsqueda fuera de las migraciones (usado por los benchmarks)."""
+    global _fts_enabled
+    if db.engine.dialect.name != 'sqlite':
+        _fts_enabled = False
+        return False
+    with db.engine.begin() as conn:
+        create_search_index(conn)
+    _fts_enabled = True
+    return True
+
+
+def search_enabled():
+    """Indica si la base de datos tiene el índice FTS5 disponible."""
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = db.engine.dialect.name == 'sqlite' and bool(db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_fts'"
+        )).first())
+    return _fts_enabled
+
+
+def build_match_query(term):
+    """Convierte el texto del buscador en una consulta MATCH de prefijos, o None si no hay palabras."""
+    tokens = re.findall(r'\w+', term.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_matches(term):
+    """Subconsulta (game_id, rank) con los juegos que coinciden; menor rank = más relevante."""
+    match = build_match_query(term)
+    if match is None:
+        return None
+    return select(
+        game_fts.c.rowid.label('game_id'),
+        game_fts.c.rank.label('rank')
+    ).where(literal_column('game_fts').op('MATCH')(match)).subquery()
@@ -0,0 +1,59 @@
+"""
+Compresión gzip de respuestas negociada con Accept-Encoding.
+
+``init_compression`` registra un after_request que comprime con gzip las
+respuestas JSON, NDJSON y CSV si el cliente lo acepta. Los listados paginados
+se arman completos con jsonify (a lo sumo MAX_LIMIT filas) y se comprimen de
+una vez si superan GZIP_MIN_SIZE; las respuestas en streaming, como la
+exportación del catálogo, se comprimen fragmento a fragmento. Como se aplica
+al final, la caché del catálogo guarda siempre el cuerpo sin comprimir.
+"""
+import zlib
+from flask import current_app, request
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            # SYNC_FLUSH envía cada fragmento sin esperar a llenar el buffer de zlib
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        # Cerrar el generador original libera el contexto del request y el cursor
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """Comprime ``response`` con gzip si el tipo es comprimible y el cliente lo acepta."""
+    if response.mimetype not in COMPRESSIBLE_TYPES or response.status_code != 200:
+        return response
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers or request.accept_encodings['gzip'] <= 0:
+        return response
+
+    level = current_app.config.get('GZIP_LEVEL', 6)
+    if response.is_streamed:
+        response.response = _gzip_stream(response.response, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config.get('GZIP_MIN_SIZE', 1024):
+            return response
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        response.set_data(compressor.compress(data) + compressor.flush())
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def init_compression(app):
+    """Activa la compresión gzip de respuestas en ``app`` si GZIP_ENABLED está activo."""
+    if app.config.get('GZIP_ENABLED', True):
+        app.after_request(compress_response)
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class TTLCache:
+    """Caché pequeña con TTL por entrada, segura entre hilos; al llenarse descarta la que vence antes."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def put(self, key, value, ttl):
+        with self._lock:
+            if len(self._data) >= self.max_size and key not in self._data:
+                # Descartar la entrada que vence antes
+                oldest = min(self._data, key=lambda k: self._data[k][1])
+                del self._data[oldest]
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
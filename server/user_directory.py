@@ -0,0 +1,98 @@
+"""
+Consultas del directorio de usuarios para el panel de administración.
+
+La búsqueda por email es por prefijo y se traduce a un rango sobre el índice
+único de email (``email >= 'ana' AND email < 'anb'``), en lugar de un LIKE que
+recorrería la tabla. Los emails se guardan en minúsculas (``normalize_email``) y
+el prefijo también se pasa a minúsculas, así que la búsqueda no distingue
+mayúsculas; los emails con mayúsculas registrados antes de normalizarlos solo
+aparecen buscando en minúsculas si se los corrige en la base. El total de usuarios de cada filtro se cachea con un TTL
+corto (USER_COUNT_CACHE_TTL) para no repetir un COUNT(*) en cada página; el
+registro y la promoción de usuarios descartan la caché del proceso.
+"""
+import sys
+from flask import current_app
+from app import db, User
+from ttl_cache import TTLCache
+
+# Cabecera donde se devuelve el total de usuarios que cumplen los filtros
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+
+DEFAULT_USER_COUNT_CACHE_TTL = 30
+USER_COUNT_CACHE_MAX_SIZE = 256
+
+
+# (prefijo de email, is_admin) -> cantidad de usuarios
+user_count_cache = TTLCache(USER_COUNT_CACHE_MAX_SIZE)
+
+
+def invalidate_user_counts():
+    """Descarta los totales cacheados; llamar después de crear usuarios o cambiar is_admin."""
+    user_count_cache.clear()
+
+
+def normalize_email(email):
+    """Forma en que se guardan y se buscan los emails: sin espacios alrededor y en minúsculas."""
+    return email.strip().lower()
+
+
+def find_user_by_email(email):
+    """
+    Usuario con ese email, sin distinguir mayúsculas. Los emails registrados antes de
+    normalizarlos pueden tener mayúsculas: primero se busca el valor exacto.
+    """
+    user = User.query.filter_by(email=email).first()
+    if user is None and normalize_email(email) != email:
+        user = User.query.filter_by(email=normalize_email(email)).first()
+    return user
+
+
+def email_prefix_upper_bound(prefix):
+    """
+    Menor cadena mayor que todas las que empiezan con ``prefix`` (prefijo no vacío),
+    o None si no hay ninguna: entonces alcanza con ``email >= prefix``.
+    """
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Los surrogates no se pueden codificar en UTF-8
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def parse_is_admin(value):
+    """Convierte el parámetro ``is_admin`` ('true'/'false', '1'/'0') en bool, o None si no viene."""
+    if value in (None, ''):
+        return None
+    if value.lower() in ('1', 'true'):
+        return True
+    if value.lower() in ('0', 'false'):
+        return False
+    raise ValueError('is_admin debe ser true o false')
+
+
+def filter_users(query, email_prefix=None, is_admin=None):
+    """Aplica a ``query`` los filtros del directorio: prefijo de email y rol."""
+    if email_prefix:
+        email_prefix = email_prefix.lower()
+        query = query.filter(User.email >= email_prefix)
+        upper_bound = email_prefix_upper_bound(email_prefix)
+        if upper_bound is not None:
+            query = query.filter(User.email < upper_bound)
+    if is_admin is not None:
+        query = query.filter(User.is_admin == is_admin)
+    return query
+
+
+def count_users(email_prefix=None, is_admin=None):
+    """Cantidad de usuarios que cumplen los filtros, desde la caché si no venció."""
+    key = ((email_prefix or '').lower(), is_admin)
+    count = user_count_cache.get(key)
+    if count is None:
+        query = filter_users(db.session.query(db.func.count(User.id)), email_prefix, is_admin)
+        count = query.scalar()
+        user_count_cache.put(key, count, current_app.config.get('USER_COUNT_CACHE_TTL',
+                                                                DEFAULT_USER_COUNT_CACHE_TTL))
+    return count
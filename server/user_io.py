@@ -0,0 +1,119 @@
+"""
+Alta masiva de usuarios desde NDJSON o CSV (columnas name, email, password).
+
+Las filas se leen y validan con las mismas funciones que la importación del
+catálogo y se procesan en lotes; los emails se pasan a minúsculas como en el
+registro. Por cada lote se buscan los emails ya registrados con una sola
+consulta IN, se calculan los hashes de las contraseñas en el pool de procesos
+y se insertan las filas con executemany. Cada lote es una transacción propia:
+si el archivo falla a la mitad, los lotes anteriores quedan confirmados. La
+regla del primer usuario administrador se comprueba una vez por lote mientras
+la tabla siga vacía.
+"""
+import heapq
+import re
+from sqlalchemy.exc import IntegrityError
+from app import db, User
+from game_io import MAX_REPORTED_ERRORS, RowError, text_field
+from passwords import hash_passwords
+from user_directory import normalize_email
+
+# Emails por lote: también es la cantidad de parámetros de la consulta IN
+DEFAULT_CHUNK_SIZE = 500
+MIN_PASSWORD_LENGTH = 8
+EMAIL_PATTERN = re.compile(r'[^@]+@[^@]+\.[^@]+')
+
+
+def validate_user_row(row):
+    """Convierte una fila del archivo en (name, email, password); lanza RowError."""
+    name = text_field(row, 'name', 100)
+    email = normalize_email(text_field(row, 'email', 120))
+    if not EMAIL_PATTERN.match(email):
+        raise RowError('Formato de email inválido')
+    password = row.get('password')
+    if not isinstance(password, str) or len(password) < MIN_PASSWORD_LENGTH:
+        raise RowError(f'La contraseña debe tener al menos {MIN_PASSWORD_LENGTH} caracteres')
+    return name, email, password
+
+
+class _Report:
+    # Los emails ya registrados se detectan al cerrar cada lote, después de errores de
+    # filas posteriores: se conservan los MAX_REPORTED_ERRORS de menor número de fila
+    # en un heap (por -fila) y se ordenan al final
+    def __init__(self):
+        self.inserted = 0
+        self.error_count = 0
+        self._errors = []
+
+    def error(self, number, message):
+        self.error_count += 1
+        entry = (-number, self.error_count, message)
+        if len(self._errors) < MAX_REPORTED_ERRORS:
+            heapq.heappush(self._errors, entry)
+        elif entry > self._errors[0]:
+            heapq.heapreplace(self._errors, entry)
+
+    def errors(self):
+        return [{'row': -number, 'error': message}
+                for number, _, message in sorted(self._errors, reverse=True)]
+
+
+def _insert_batch(batch, report, has_users):
+    # batch: [(número de fila, name, email, password)]; devuelve si la tabla ya tiene usuarios
+    emails = [email for _, _, email, _ in batch]
+    existing = {email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))}
+    pending = []
+    for entry in batch:
+        if entry[2] in existing:
+            report.error(entry[0], 'El email ya está registrado')
+        else:
+            pending.append(entry)
+    if not pending:
+        return has_users
+
+    if not has_users:
+        has_users = db.session.query(User.id).first() is not None
+    hashes = hash_passwords([password for _, _, _, password in pending])
+    values = [{'name': name, 'email': email, 'password': password_hash,
+               'is_admin': not has_users and i == 0}
+              for i, ((_, name, email, _), password_hash) in enumerate(zip(pending, hashes))]
+    try:
+        db.session.execute(User.__table__.insert(), values)
+        db.session.commit()
+    except IntegrityError:
+        # Otro request registró alguno de estos emails mientras se calculaban los hashes
+        db.session.rollback()
+        for number, _, _, _ in pending:
+            report.error(number, 'Conflicto con un registro simultáneo, reintente la fila')
+        return has_users
+    report.inserted += len(pending)
+    return True
+
+
+def provision_users(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Valida e inserta las filas de ``iter_rows``, haciendo commit por lote.
+    Devuelve (insertados, errores, total de errores) como ``import_games``.
+    """
+    report = _Report()
+    seen = set()
+    batch = []
+    has_users = False
+    for number, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            name, email, password = validate_user_row(row)
+            if email in seen:
+                raise RowError('Email repetido en el archivo')
+        except RowError as e:
+            report.error(number, str(e))
+            continue
+        seen.add(email)
+        batch.append((number, name, email, password))
+        if len(batch) >= chunk_size:
+            has_users = _insert_batch(batch, report, has_users)
+            batch = []
+    if batch:
+        _insert_batch(batch, report, has_users)
+    return report.inserted, report.errors(), report.error_count
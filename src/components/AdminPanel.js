@@ -3,10 +3,13 @@ import axios from 'axios';
 
 const AdminPanel = () => {
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [emailSearch, setEmailSearch] = useState('');
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
 
-  const fetchUsers = async () => {
+  const fetchUsers = async (after = null) => {
     const token = localStorage.getItem('token');
     if (!token) {
         setError('No autenticado o token no encontrado.');
@@ -14,10 +17,16 @@ const AdminPanel = () => {
     }
 
     try {
+      const params = {};
+      if (emailSearch) params.email = emailSearch;
+      if (after) params.after = after;
       const response = await axios.get('/api/users', {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params
       });
-      setUsers(response.data);
+      setUsers(prev => (after ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
+      setTotal(response.headers['x-total-count'] ?? null);
     } catch (err) {
       setError('Error al cargar usuarios');
       console.error('Error fetching users:', err.response?.data?.msg || err.message);
@@ -26,7 +35,7 @@ const AdminPanel = () => {
 
   useEffect(() => {
     fetchUsers();
-  }, []);
+  }, [emailSearch]);
 
   const promoteToAdmin = async (userId) => {
     setError('');
@@ -53,7 +62,14 @@ const AdminPanel = () => {
       <h1 className="text-2xl font-bold mb-4">Panel de Administración</h1>
       {error && <div className="bg-red-100 border border-red-400 text-red-700 px-4 py-2 mb-2 rounded">{error}</div>}
       {success && <div className="bg-green-100 border border-green-400 text-green-700 px-4 py-2 mb-2 rounded">{success}</div>}
-      <h2 className="text-xl font-semibold mb-2">Usuarios</h2>
+      <h2 className="text-xl font-semibold mb-2">Usuarios{total !== null && ` (${total})`}</h2>
+      <input
+        type="text"
+        placeholder="Buscar por email (comienza con)..."
+        value={emailSearch}
+        onChange={(e) => setEmailSearch(e.target.value)}
+        className="border rounded px-2 py-1 mb-2"
+      />
       <table className="min-w-full bg-white border rounded">
         <thead>
           <tr>
@@ -83,6 +99,14 @@ const AdminPanel = () => {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <button
+          onClick={() => fetchUsers(nextCursor)}
+          className="mt-4 bg-gray-500 text-white px-4 py-2 rounded"
+        >
+          Cargar más
+        </button>
+      )}
     </div>
   );
 };
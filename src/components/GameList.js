@@ -10,21 +10,24 @@ const GameList = ({ user }) => {
     const [sortBy, setSortBy] = useState('name');
     const [sortOrder, setSortOrder] = useState('asc');
     const [editGame, setEditGame] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
     const navigate = useNavigate();
 
     console.log('GameList received user prop:', user);
 
-    const fetchGames = useCallback(async () => {
+    const fetchGames = useCallback(async (after = null) => {
         try {
             const response = await axios.get(`/api/games`, {
                 params: {
                     search,
                     category,
                     sort_by: sortBy,
-                    sort_order: sortOrder
+                    sort_order: sortOrder,
+                    ...(after ? { after } : {})
                 }
             });
-            setGames(response.data);
+            setGames(prev => (after ? [...prev, ...response.data] : response.data));
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (error) {
             console.error('Error fetching games:', error);
         }
@@ -142,6 +145,15 @@ const GameList = ({ user }) => {
                     </div>
                 ))}
             </div>
+
+            {nextCursor && (
+                <button
+                    onClick={() => fetchGames(nextCursor)}
+                    className="mt-4 bg-gray-500 text-white px-4 py-2 rounded"
+                >
+                    Cargar más
+                </button>
+            )}
         </div>
     );
 };
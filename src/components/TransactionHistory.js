@@ -4,6 +4,7 @@ import { useNavigate } from 'react-router-dom';
 
 const TransactionHistory = () => {
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [error, setError] = useState('');
     const navigate = useNavigate();
 
@@ -11,13 +12,15 @@ const TransactionHistory = () => {
         fetchTransactions();
     }, []);
 
-    const fetchTransactions = async () => {
+    const fetchTransactions = async (after = null) => {
         try {
             const token = localStorage.getItem('token');
             const response = await axios.get('/api/transactions', {
-                headers: { Authorization: `Bearer ${token}` }
+                headers: { Authorization: `Bearer ${token}` },
+                params: after ? { after } : {}
             });
-            setTransactions(response.data);
+            setTransactions(prev => (after ? [...prev, ...response.data] : response.data));
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (error) {
             setError('Error al cargar el historial de transacciones');
             console.error('Error fetching transactions:', error);
@@ -107,6 +110,15 @@ const TransactionHistory = () => {
                 </div>
             )}
 
+            {nextCursor && (
+                <button
+                    onClick={() => fetchTransactions(nextCursor)}
+                    className="mt-4 mr-2 bg-gray-500 text-white px-4 py-2 rounded"
+                >
+                    Cargar más
+                </button>
+            )}
+
             <button
                 onClick={() => navigate('/games')}
                 className="mt-4 bg-blue-500 text-white px-4 py-2 rounded"